@@ -1,4 +1,26 @@
 import bpy
+import time
+import numpy as np
+from . import split
+
+def get_output_key(obj, name):
+    # Add an empty shape key, replacing an existing one with the same name
+    shape_keys = obj.data.shape_keys.key_blocks
+    if name in shape_keys:
+        obj.shape_key_remove(shape_keys[name])
+    return obj.shape_key_add(name=name, from_mix=False)
+
+def get_side_weights(props, basis):
+    # Left and right weights of every vertex from the falloff settings, computed once per mesh
+    left_weight = split.side_weights(basis, props.falloff, props.blend_width, tuple(props.falloff_curve))
+    return left_weight, 1.0 - left_weight
+
+def write_split_keys(obj, base_shape_name, basis, delta, left_weight, right_weight, out=None):
+    # Write the left and right halves of a key as basis + delta * weight, each with one bulk set
+    left_key = get_output_key(obj, base_shape_name + "_Left")
+    right_key = get_output_key(obj, base_shape_name + "_Right")
+    split.write_co(left_key.data, split.weighted_key(basis, delta, left_weight, out))
+    split.write_co(right_key.data, split.weighted_key(basis, delta, right_weight, out))
 
 class OBJECT_OT_split_shape_key_lr(bpy.types.Operator):
     bl_idname = "object.split_shape_key_lr"
@@ -27,57 +49,285 @@ class OBJECT_OT_split_shape_key_lr(bpy.types.Operator):
         
         shape_keys = obj.data.shape_keys.key_blocks
         
-        # Check if the target shape keys already exist
+        # Check if the target shape keys already exist, they are removed and added again
         if left_shape in shape_keys or right_shape in shape_keys:
             self.report({'WARNING'}, f"Shape keys with names '{left_shape}' or '{right_shape}' already exist. They will be overwritten.")
-            
-            # If they exist, remove them first
-            if left_shape in shape_keys:
-                obj.shape_key_remove(shape_keys[left_shape])
-            if right_shape in shape_keys:
-                obj.shape_key_remove(shape_keys[right_shape])
-
-        # Create temporary vertex groups for left (X > 0) and right (X < 0) sides
-        left_group = obj.vertex_groups.new(name="__temp_left")
-        right_group = obj.vertex_groups.new(name="__temp_right")
-
-        for v in obj.data.vertices:
-            if v.co.x > 0:  # Left side (X > 0)
-                left_group.add([v.index], 1.0, 'ADD')
-            elif v.co.x < 0:  # Right side (X < 0)
-                right_group.add([v.index], 1.0, 'ADD')
-
-        # Add new shape keys
-        obj.shape_key_add(name=left_shape, from_mix=False)
-        obj.shape_key_add(name=right_shape, from_mix=False)
-
-        # Copy shape data from original to left/right shape keys
-        def copy_shape_data(target, direction):
-            original = obj.data.shape_keys.key_blocks[base_shape_name]
-            basis = obj.data.shape_keys.key_blocks["Basis"]
-            target_shape = obj.data.shape_keys.key_blocks[target]
-
-            for i, v in enumerate(obj.data.vertices):
-                is_left = direction == "LEFT" and v.co.x > 0  # Left side (X > 0)
-                is_right = direction == "RIGHT" and v.co.x < 0  # Right side (X < 0)
-                if is_left or is_right:
-                    target_shape.data[i].co = original.data[i].co
-                else:
-                    target_shape.data[i].co = basis.data[i].co
-
-        # Apply shape data to the new shape keys
-        copy_shape_data(left_shape, "LEFT")
-        copy_shape_data(right_shape, "RIGHT")
-
-        # Clean up temporary vertex groups
-        obj.vertex_groups.remove(left_group)
-        obj.vertex_groups.remove(right_group)
+
+        # Read the basis and the key once, the side weights come from the basis
+        basis = split.read_co(obj.data.shape_keys.reference_key.data)
+        delta = split.read_co(shape_keys[base_shape_name].data) - basis
+        left_weight, right_weight = get_side_weights(props, basis)
+        write_split_keys(obj, base_shape_name, basis, delta, left_weight, right_weight)
 
         self.report({'INFO'}, f"Shape key '{base_shape_name}' split into '{left_shape}' and '{right_shape}'")
         return {'FINISHED'}
 
+def get_region_groups(props):
+    return [name.strip() for name in props.region_groups.split(",") if name.strip()]
+
+def get_part_suffixes(props):
+    return [suffix.strip() for suffix in props.part_suffixes.split(",") if suffix.strip()]
+
+def get_generated_suffixes(props):
+    # Name suffixes of the parts made by any of the splits
+    suffixes = ["_Left", "_Right", props.positive_suffix, props.negative_suffix]
+    suffixes += ["_" + name for name in get_region_groups(props)] + get_part_suffixes(props)
+    return tuple(suffix for suffix in suffixes if suffix.strip())
+
+def get_batch_keys(obj, props):
+    # Keys selected for a batch split, leaving out the basis and keys which are split parts already
+    # so splitting everything again does not split the parts of the last run
+    shape_keys = obj.data.shape_keys
+    suffixes = get_generated_suffixes(props)
+    names = [key.name for key in shape_keys.key_blocks
+             if key != shape_keys.reference_key and not key.name.endswith(suffixes)]
+    return split.select_keys(names, props.batch_keys)
+
+class OBJECT_OT_split_shape_keys_lr_batch(bpy.types.Operator):
+    bl_idname = "object.split_shape_keys_lr_batch"
+    bl_label = "Split Matching Shape Keys Left/Right"
+    bl_description = "Split every shape key matching the batch names into left and right, in one undo step"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        props = context.scene.split_shape_key_props
+        return (obj and
+                obj.type == 'MESH' and
+                obj.data.shape_keys and
+                props.batch_keys.strip() != "")
+
+    def execute(self, context):
+        obj = context.object
+        props = context.scene.split_shape_key_props
+        names = get_batch_keys(obj, props)
+        if not names:
+            self.report({'WARNING'}, f"No shape keys match '{props.batch_keys}'")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        # The basis and the side weights are read once for the whole batch
+        basis = split.read_co(obj.data.shape_keys.reference_key.data)
+        left_weight, right_weight = get_side_weights(props, basis)
+        # Every key goes through the same buffers
+        delta = basis.copy()
+        out = basis.copy()
+        read_time = 0.0
+        for name in names:
+            read_start = time.perf_counter()
+            split.read_co(obj.data.shape_keys.key_blocks[name].data, delta)
+            read_time += time.perf_counter() - read_start
+            delta -= basis
+            write_split_keys(obj, name, basis, delta, left_weight, right_weight, out)
+        total_time = time.perf_counter() - start
+
+        self.report({'INFO'}, f"Split {len(names)} shape keys into left and right in {total_time * 1000:.0f} ms "
+                              f"({read_time * 1000:.0f} ms reading, {(total_time - read_time) * 1000:.0f} ms splitting and writing)")
+        return {'FINISHED'}
+
+def read_region_weights(obj, names):
+    # Weights of the vertex groups as a (groups, vertices) array
+    # The Python API has no bulk read of deform weights, so they are gathered in one pass over the vertices
+    rows = {obj.vertex_groups[name].index: row for row, name in enumerate(names)}
+    weights = np.zeros((len(names), len(obj.data.vertices)), dtype=np.float32)
+    for vertex in obj.data.vertices:
+        for group in vertex.groups:
+            row = rows.get(group.group)
+            if row is not None:
+                weights[row, vertex.index] = group.weight
+    return weights
+
+def get_region_suffixes(props):
+    # Name suffix of every region, every part needs a suffix of its own or it would overwrite
+    # the original key or another part
+    if props.region_mode == 'PLANE':
+        suffixes = [props.positive_suffix, props.negative_suffix]
+        if not all(suffix.strip() for suffix in suffixes):
+            raise ValueError("Enter a name suffix for both sides of the plane")
+    else:
+        suffixes = ["_" + name for name in get_region_groups(props)]
+    duplicates = sorted(set(suffix for suffix in suffixes if suffixes.count(suffix) > 1))
+    if duplicates:
+        raise ValueError(f"More than one part would be named with {', '.join(duplicates)}")
+    return suffixes
+
+def get_region_weights(obj, props, basis):
+    # (regions, vertices) weights summing to 1 for every vertex and the name suffix of every region
+    suffixes = get_region_suffixes(props)
+    if props.region_mode == 'PLANE':
+        distance = split.plane_distance(basis, props.plane_origin, props.plane_normal)
+        positive = split.falloff_weights(distance, props.falloff, props.blend_width, tuple(props.falloff_curve))
+        return np.stack((positive, 1.0 - positive)), suffixes
+    names = get_region_groups(props)
+    missing = [name for name in names if name not in obj.vertex_groups]
+    if missing:
+        raise ValueError(f"Missing vertex groups: {', '.join(missing)}")
+    if len(names) < 2:
+        raise ValueError("Enter at least two region vertex groups")
+    return split.normalize_regions(read_region_weights(obj, names)), suffixes
+
+class OBJECT_OT_split_shape_key_regions(bpy.types.Operator):
+    bl_idname = "object.split_shape_key_regions"
+    bl_label = "Split Shape Key Into Regions"
+    bl_description = "Split shape keys by a plane or into one key per region vertex group, the parts add up to the original key"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    batch: bpy.props.BoolProperty(
+        name="Batch",
+        description="Split every shape key matching the batch names instead of the selected one",
+        default=False
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return (obj and
+                obj.type == 'MESH' and
+                obj.data.shape_keys)
+
+    def execute(self, context):
+        obj = context.object
+        props = context.scene.split_shape_key_props
+        start = time.perf_counter()
+        # The basis and the weights of every region are read once
+        basis = split.read_co(obj.data.shape_keys.reference_key.data)
+        try:
+            weights, suffixes = get_region_weights(obj, props, basis)
+        except ValueError as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
+
+        if self.batch:
+            names = get_batch_keys(obj, props)
+        elif props.shape_key_name in obj.data.shape_keys.key_blocks:
+            names = [props.shape_key_name]
+        else:
+            names = []
+        if not names:
+            self.report({'WARNING'}, "No shape keys to split")
+            return {'CANCELLED'}
+
+        # Every key goes through the same buffers, all regions of a key are computed at once
+        delta = basis.copy()
+        out = np.empty((len(weights),) + basis.shape, dtype=np.float32)
+        for name in names:
+            split.read_co(obj.data.shape_keys.key_blocks[name].data, delta)
+            delta -= basis
+            split.region_keys(basis, delta, weights, out)
+            for suffix, co in zip(suffixes, out):
+                split.write_co(get_output_key(obj, name + suffix).data, co)
+        total_time = time.perf_counter() - start
+
+        self.report({'INFO'}, f"Split {len(names)} shape keys into {len(weights)} regions in {total_time * 1000:.0f} ms")
+        return {'FINISHED'}
+
+def sum_part_deltas(obj, parts, basis, total, buffer):
+    # Sum of the deltas of the parts, every part is read into the same buffer
+    total.fill(0.0)
+    for name in parts:
+        total += split.read_co(obj.data.shape_keys.key_blocks[name].data, buffer)
+    total -= len(parts) * basis
+    return total
+
+class OBJECT_OT_recombine_shape_keys(bpy.types.Operator):
+    bl_idname = "object.recombine_shape_keys"
+    bl_label = "Recombine Split Shape Keys"
+    bl_description = "Merge the parts of every split shape key matching the batch names back into one key"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return (obj and
+                obj.type == 'MESH' and
+                obj.data.shape_keys)
+
+    def execute(self, context):
+        obj = context.object
+        props = context.scene.split_shape_key_props
+        suffixes = get_part_suffixes(props)
+        start = time.perf_counter()
+        groups = split.find_split_groups(obj.data.shape_keys.key_blocks.keys(), suffixes)
+        names = split.select_keys(list(groups), props.batch_keys)
+        if not names:
+            self.report({'WARNING'}, f"No shape keys split into {', '.join(suffixes)} match '{props.batch_keys}'")
+            return {'CANCELLED'}
+
+        basis = split.read_co(obj.data.shape_keys.reference_key.data)
+        total = basis.copy()
+        buffer = basis.copy()
+        for name in names:
+            sum_part_deltas(obj, groups[name], basis, total, buffer)
+            target = name + props.combined_suffix
+            # An existing key is overwritten in place so its position and settings are kept
+            key = obj.data.shape_keys.key_blocks.get(target)
+            if key is None:
+                key = obj.shape_key_add(name=target, from_mix=False)
+            total += basis
+            split.write_co(key.data, total)
+        total_time = time.perf_counter() - start
+
+        self.report({'INFO'}, f"Recombined {len(names)} shape keys in {total_time * 1000:.0f} ms")
+        return {'FINISHED'}
+
+class OBJECT_OT_validate_split_keys(bpy.types.Operator):
+    bl_idname = "object.validate_split_keys"
+    bl_label = "Validate Split Shape Keys"
+    bl_description = "Check that the parts of every split shape key add up to the original key, every key above the tolerance is reported"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return (obj and
+                obj.type == 'MESH' and
+                obj.data.shape_keys)
+
+    def execute(self, context):
+        obj = context.object
+        props = context.scene.split_shape_key_props
+        suffixes = get_part_suffixes(props)
+        start = time.perf_counter()
+        key_blocks = obj.data.shape_keys.key_blocks
+        # Only keys whose original still exists can be compared
+        groups = {name: parts for name, parts in split.find_split_groups(key_blocks.keys(), suffixes).items() if name in key_blocks}
+        if not groups:
+            self.report({'WARNING'}, f"No shape keys split into {', '.join(suffixes)} with their original key")
+            return {'CANCELLED'}
+
+        basis = split.read_co(obj.data.shape_keys.reference_key.data)
+        total = basis.copy()
+        buffer = basis.copy()
+        results = []
+        for name, parts in groups.items():
+            sum_part_deltas(obj, parts, basis, total, buffer)
+            original = split.read_co(key_blocks[name].data, buffer)
+            original -= basis
+            results.append((name,) + split.deviation(total, original))
+        total_time = time.perf_counter() - start
+
+        failed = [result for result in results if result[1] > props.validation_tolerance]
+        for name, max_deviation, mean_deviation in failed:
+            self.report({'WARNING'}, f"'{name}' parts deviate by up to {max_deviation:.6g} (mean {mean_deviation:.6g})")
+        worst = max(result[1] for result in results)
+        self.report({'WARNING'} if failed else {'INFO'},
+                    f"Checked {len(results)} split shape keys in {total_time * 1000:.0f} ms, {len(failed)} above the tolerance, "
+                    f"largest deviation {worst:.6g}")
+        return {'FINISHED'}
+
+classes = (
+    OBJECT_OT_split_shape_key_lr,
+    OBJECT_OT_split_shape_keys_lr_batch,
+    OBJECT_OT_split_shape_key_regions,
+    OBJECT_OT_recombine_shape_keys,
+    OBJECT_OT_validate_split_keys,
+)
+
 def register():
-    bpy.utils.register_class(OBJECT_OT_split_shape_key_lr)
+    for cls in classes:
+        bpy.utils.register_class(cls)
 
 def unregister():
-    bpy.utils.unregister_class(OBJECT_OT_split_shape_key_lr)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
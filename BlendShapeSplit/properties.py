@@ -22,6 +22,93 @@ class SplitShapeKeyProperties(bpy.types.PropertyGroup):
         description="Select the symmetric shape key to split",
         items=get_shape_keys
     )
+    falloff: bpy.props.EnumProperty(
+        name="Falloff",
+        description="How the split blends from the right to the left side across the center",
+        items=[
+            ('STEP', "Hard", "Hard split at the center, vertices on the center line go half to each side"),
+            ('LINEAR', "Linear", "Blend linearly over the blend width"),
+            ('SMOOTHSTEP', "Smooth", "Blend smoothly over the blend width"),
+            ('CURVE', "Custom", "Blend over the blend width following the falloff curve"),
+        ],
+        default='STEP'
+    )
+    blend_width: bpy.props.FloatProperty(
+        name="Blend Width",
+        description="Width of the blend around the center, in the units of the basis",
+        default=0.02,
+        min=0.0,
+        soft_max=1.0,
+        unit='LENGTH'
+    )
+    falloff_curve: bpy.props.FloatVectorProperty(
+        name="Falloff Curve",
+        description="Left side weight at evenly spaced points from the right to the left edge of the blend",
+        size=5,
+        default=(0.0, 0.1, 0.5, 0.9, 1.0),
+        min=0.0,
+        max=1.0
+    )
+    region_mode: bpy.props.EnumProperty(
+        name="Regions",
+        description="How the region split divides a shape key",
+        items=[
+            ('PLANE', "Plane", "Two parts, one on each side of a plane"),
+            ('GROUPS', "Vertex Groups", "One part per vertex group, weights are normalized so the parts add up to the key"),
+        ],
+        default='PLANE'
+    )
+    plane_origin: bpy.props.FloatVectorProperty(
+        name="Plane Origin",
+        description="A point on the split plane, in the local space of the mesh",
+        size=3,
+        default=(0.0, 0.0, 0.0),
+        subtype='TRANSLATION'
+    )
+    plane_normal: bpy.props.FloatVectorProperty(
+        name="Plane Normal",
+        description="Direction of the positive side of the split plane, in the local space of the mesh",
+        size=3,
+        default=(0.0, 0.0, 1.0),
+        subtype='XYZ'
+    )
+    positive_suffix: bpy.props.StringProperty(
+        name="Positive Suffix",
+        description="Added to the name of the part on the positive side of the plane",
+        default="_Upper"
+    )
+    negative_suffix: bpy.props.StringProperty(
+        name="Negative Suffix",
+        description="Added to the name of the part on the negative side of the plane",
+        default="_Lower"
+    )
+    region_groups: bpy.props.StringProperty(
+        name="Region Groups",
+        description="Comma separated vertex groups, one part named after each group is made per shape key",
+        default=""
+    )
+    part_suffixes: bpy.props.StringProperty(
+        name="Part Suffixes",
+        description="Comma separated name suffixes of the parts of a split shape key, used to recombine and validate them",
+        default="_Left, _Right"
+    )
+    combined_suffix: bpy.props.StringProperty(
+        name="Combined Suffix",
+        description="Added to the name of a recombined shape key, leave empty to overwrite the original key",
+        default="_Combined"
+    )
+    validation_tolerance: bpy.props.FloatProperty(
+        name="Tolerance",
+        description="Largest distance the parts of a split shape key may add up to away from the original key",
+        default=0.0001,
+        min=0.0,
+        precision=6
+    )
+    batch_keys: bpy.props.StringProperty(
+        name="Batch Keys",
+        description="Shape keys split by the batch split: comma separated names or patterns such as mouth*, brow*. Parts made by an earlier split are left out",
+        default="*"
+    )
 
 def register():
     bpy.utils.register_class(SplitShapeKeyProperties)
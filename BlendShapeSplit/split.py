@@ -0,0 +1,103 @@
+import fnmatch
+import numpy as np
+
+# Shape key coordinates are moved in and out of NumPy arrays with one
+# foreach_get/foreach_set call each, nothing here loops over vertices.
+
+
+def read_co(data, out=None):
+    # Read the coordinates of a shape key (or of mesh vertices) as an (n, 3) array
+    # Pass out to reuse the same array for every key of a batch
+    if out is None:
+        out = np.empty((len(data), 3), dtype=np.float32)
+    data.foreach_get("co", out.ravel())
+    return out
+
+
+def write_co(data, co):
+    # Write an (n, 3) array to the coordinates of a shape key
+    data.foreach_set("co", np.ascontiguousarray(co, dtype=np.float32).ravel())
+
+
+def falloff_weights(distance, falloff='STEP', width=0.0, curve=(0.0, 1.0)):
+    # Weight of the positive side for every signed distance to a split plane, the negative side
+    # weighs 1 - weight so both halves always add up to the original key
+    # STEP is a hard split with vertices on the plane shared half and half, the other falloffs
+    # blend from the negative to the positive side over width centered on the plane, CURVE maps
+    # the blend through the curve values spaced evenly from the negative to the positive edge
+    if falloff == 'STEP' or width <= 0.0:
+        return np.where(distance > 0, 1.0, np.where(distance < 0, 0.0, 0.5)).astype(np.float32)
+    t = np.clip(distance / width + 0.5, 0.0, 1.0)
+    if falloff == 'SMOOTHSTEP':
+        t = t * t * (3.0 - 2.0 * t)
+    elif falloff == 'CURVE':
+        t = np.interp(t, np.linspace(0.0, 1.0, len(curve)), curve)
+    return t.astype(np.float32)
+
+
+def side_weights(basis, falloff='STEP', width=0.0, curve=(0.0, 1.0)):
+    # Weight of the left side (X > 0) for every vertex of the basis
+    return falloff_weights(basis[:, 0], falloff, width, curve)
+
+
+def plane_distance(basis, origin, normal):
+    # Signed distance of every vertex of the basis to the plane through origin with normal
+    normal = np.asarray(normal, dtype=np.float32)
+    length = np.linalg.norm(normal)
+    if length == 0.0:
+        raise ValueError("The plane normal has no length")
+    return (basis - np.asarray(origin, dtype=np.float32)) @ (normal / length)
+
+
+def weighted_key(basis, delta, weight, out=None):
+    # basis + delta * weight for every vertex
+    out = np.multiply(delta, weight[:, np.newaxis], out=out)
+    out += basis
+    return out
+
+
+def normalize_regions(weights):
+    # Scale the (regions, vertices) weights so every vertex sums to 1 over the regions,
+    # vertices outside every region are shared evenly so the regions still add up to the key
+    weights = np.asarray(weights, dtype=np.float32)
+    total = weights.sum(axis=0)
+    covered = total > 0
+    normalized = np.full(weights.shape, 1.0 / len(weights), dtype=np.float32)
+    normalized[:, covered] = weights[:, covered] / total[covered]
+    return normalized
+
+
+def region_keys(basis, delta, weights, out=None):
+    # basis + delta * weight of every region in one broadcast multiply, returns (regions, vertices, 3)
+    out = np.multiply(weights[:, :, np.newaxis], delta[np.newaxis], out=out)
+    out += basis
+    return out
+
+
+def select_keys(names, patterns):
+    # Names matching any of the comma separated patterns (shell wildcards), in key order
+    patterns = [pattern.strip() for pattern in patterns.split(",") if pattern.strip()]
+    return [name for name in names if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)]
+
+
+def find_split_groups(names, suffixes):
+    # Base names of keys which have a part for every suffix, with the part names in suffix order
+    present = set(names)
+    groups = {}
+    for name in names:
+        for suffix in suffixes:
+            base = name[:-len(suffix)]
+            if not name.endswith(suffix) or not base or base in groups:
+                continue
+            parts = [base + part_suffix for part_suffix in suffixes]
+            if all(part in present for part in parts):
+                groups[base] = parts
+    return groups
+
+
+def deviation(delta, reference):
+    # Max and mean distance between the vertices of two deltas
+    distance = np.linalg.norm(delta - reference, axis=1)
+    if len(distance) == 0:
+        return 0.0, 0.0
+    return float(distance.max()), float(distance.mean())
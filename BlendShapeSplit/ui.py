@@ -28,12 +28,51 @@ class OBJECT_PT_shape_key_splitter(bpy.types.Panel):
         box.label(text="Select Shape Key to Split:")
         box.prop(props, "shape_key_name", text="")
         
+        # Blend across the center
+        box = layout.box()
+        box.prop(props, "falloff")
+        if props.falloff != 'STEP':
+            box.prop(props, "blend_width")
+        if props.falloff == 'CURVE':
+            box.row(align=True).prop(props, "falloff_curve", text="")
+
         # Only enable the button if a shape key is selected
         row = layout.row()
         row.scale_y = 1.5
         row.operator("object.split_shape_key_lr", icon="MOD_MIRROR")
         row.enabled = props.shape_key_name != ""
 
+        # Split many shape keys at once
+        box = layout.box()
+        box.label(text="Batch Split:")
+        box.prop(props, "batch_keys", text="")
+        box.operator("object.split_shape_keys_lr_batch", icon="MOD_MIRROR")
+
+        # Split by a plane or into vertex group regions
+        box = layout.box()
+        box.label(text="Region Split:")
+        box.prop(props, "region_mode")
+        if props.region_mode == 'PLANE':
+            box.prop(props, "plane_origin")
+            box.prop(props, "plane_normal")
+            row = box.row(align=True)
+            row.prop(props, "positive_suffix", text="")
+            row.prop(props, "negative_suffix", text="")
+        else:
+            box.prop(props, "region_groups", text="")
+        row = box.row(align=True)
+        row.operator("object.split_shape_key_regions", text="Split Selected").batch = False
+        row.operator("object.split_shape_key_regions", text="Split Batch").batch = True
+
+        # Merge split keys back and check that they add up to the original
+        box = layout.box()
+        box.label(text="Recombine:")
+        box.prop(props, "part_suffixes", text="Parts")
+        box.prop(props, "combined_suffix", text="Suffix")
+        box.operator("object.recombine_shape_keys", icon="AUTOMERGE_ON")
+        box.prop(props, "validation_tolerance")
+        box.operator("object.validate_split_keys", icon="CHECKMARK")
+
 def register():
     bpy.utils.register_class(OBJECT_PT_shape_key_splitter)
 
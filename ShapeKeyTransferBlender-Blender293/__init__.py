@@ -44,7 +44,10 @@ classes = (
     SKT_OT_insertKeyNames,
     SKT_OT_transferShapeKeys,
     SKT_OT_transferExcludedShapeKeys,
+    SKT_OT_transferShapeKeysBatch,
+    SKT_OT_dispatchWorkers,
     SKT_OT_removeShapeKeys,
+    SKT_OT_clearCache,
     SKT_OT_actions,
     SKT_OT_clearList,
     SKT_OT_removeDuplicates,
@@ -61,9 +64,16 @@ def register():
     bpy.types.Scene.shapekeytransfer = PointerProperty(type=SKT_PG_settings)
     bpy.types.Scene.customshapekeylist = CollectionProperty(type=SKT_PG_shapeKeyListItem)
 
+    for handlers in MESH_USERS_HANDLERS:
+        getattr(bpy.app.handlers, handlers).append(invalidate_mesh_users)
+
 
 def unregister():    
     from bpy.utils import unregister_class
+    for handlers in MESH_USERS_HANDLERS:
+        if(invalidate_mesh_users in getattr(bpy.app.handlers, handlers)):
+            getattr(bpy.app.handlers, handlers).remove(invalidate_mesh_users)
+
     for cls in reversed(classes):
         unregister_class(cls)
 
@@ -0,0 +1,155 @@
+#----------------------------------------------------------
+# File batch.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+# Transfers shape keys without the user interface as described by a job manifest, saves the file and writes a report.
+# Run as:
+#   blender --background file.blend --python batch.py -- <manifest> <report> [output file]
+# The manifest is a JSON file:
+#   {
+#       "source": "Head",                       source object
+#       "destinations": ["Beard", "Brows"],     destination objects, the Destination Collection or the selection when left out
+#       "excluded_keys": ["Expressions_max"],   shape keys not transferred, the excluded list of the scene when left out
+#       "only_excluded_keys": false,            transfer only the excluded shape keys instead
+#       "settings": {"transfer_mode": "SURFACE", "bounds_object": "CollarBox"},
+#       "save": true                            save the file, to the output file when given
+#   }
+# settings take the names of the shape key transfer scene settings, objects, meshes and collections are given by name.
+# The report is a JSON file with the time of every stage and the matched and unpaired vertices of every destination.
+# The exit code is 0 when every destination got the shape keys.
+
+import os
+import sys
+import json
+import time
+import importlib
+import traceback
+import bpy
+
+
+# set the scene settings from the manifest, pointer settings are looked up by name
+def apply_settings(skt, settings):
+    data = {'Object': bpy.data.objects, 'Mesh': bpy.data.meshes, 'Collection': bpy.data.collections}
+    for name, value in settings.items():
+        prop = skt.bl_rna.properties.get(name)
+        if(prop is None):
+            raise ValueError("Unknown setting " + name)
+        if(prop.type == 'POINTER'):
+            if(value):
+                collection = data[prop.fixed_type.identifier]
+                if(not value in collection):
+                    raise ValueError("There is no " + prop.fixed_type.identifier.lower() + " " + value + " for " + name)
+                value = collection[value]
+            else:
+                value = None
+        setattr(skt, name, value)
+
+# objects named in the manifest
+def get_objects(names):
+    missing = [name for name in names if not name in bpy.data.objects]
+    if(missing):
+        raise ValueError("There are no objects " + ", ".join(missing))
+    return [bpy.data.objects[name] for name in names]
+
+# run the steps of a batch transfer and add up the seconds of every stage per destination
+def run_timed(engine, steps):
+    timings = {}
+    stage = None
+    last = time.perf_counter()
+    for step in steps:
+        now = time.perf_counter()
+        # the work of a step belongs to the stage it ends in, the last steps of a transfer end with no stage
+        stage = engine.stage or stage
+        stages = timings.setdefault(engine.batch_index, {})
+        stages[stage] = stages.get(stage, 0.0) + now - last
+        last = now
+    stages = timings.setdefault(engine.batch_index, {})
+    stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - last
+    return timings
+
+def run_job(addon, manifest, output):
+    report = {"file": bpy.data.filepath, "destinations": [], "failed": True}
+    skt = bpy.context.scene.shapekeytransfer
+    apply_settings(skt, manifest.get("settings", {}))
+
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    engine.load_settings(skt)
+    if("excluded_keys" in manifest):
+        engine.excluded_shape_keys = list(set(manifest["excluded_keys"]) | set(["Basis"]))
+    else:
+        engine.update_shape_keys_list(bpy.context.scene.customshapekeylist)
+
+    src_object = get_objects([manifest["source"]])[0]
+    skt.src_mesh = src_object.data
+    if("destinations" in manifest):
+        dest_objects = get_objects(manifest["destinations"])
+    else:
+        dest_objects = addon.shapekeytransfer.get_batch_destinations(bpy.context)
+
+    start = time.perf_counter()
+    timings = run_timed(engine, engine.iter_transfer_batch(src_object.data, dest_objects, manifest.get("only_excluded_keys", False)))
+    report["seconds"] = time.perf_counter() - start
+    report["message"] = engine.message
+    report["peak_memory_mb"] = engine.memory.peak / addon.memory.MEGABYTE
+    for index, (name, matched, unpaired, error) in enumerate(engine.batch_summary):
+        report["destinations"].append({
+            "name": name,
+            "matched_vertices": matched,
+            "unpaired_vertices": unpaired,
+            "error": error,
+            "stage_seconds": {str(stage): seconds for stage, seconds in timings.get(index, {}).items()}})
+    report["failed"] = len(engine.batch_summary) == 0 or any(summary[3] for summary in engine.batch_summary)
+
+    if(manifest.get("save", True) and not engine.failed):
+        if(output):
+            bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(output))
+        else:
+            bpy.ops.wm.save_mainfile()
+        report["saved"] = bpy.data.filepath
+    return report
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    manifest_path = argv[0]
+    report_path = argv[1]
+    output = argv[2] if len(argv) > 2 else ""
+
+    # import this addon from the folder containing it, it may not be installed in a factory startup
+    addon_directory = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(addon_directory))
+    addon = importlib.import_module(os.path.basename(addon_directory))
+    addon.register()
+
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        report = run_job(addon, manifest, output)
+    except Exception as e:
+        traceback.print_exc()
+        report = {"file": bpy.data.filepath, "destinations": [], "failed": True, "error": str(e)}
+    with open(report_path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    print(report.get("message", report.get("error")))
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
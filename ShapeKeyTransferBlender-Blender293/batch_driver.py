@@ -0,0 +1,102 @@
+#----------------------------------------------------------
+# File batch_driver.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+# Runs the batch job of a manifest on many .blend files in a pool of background Blender processes.
+# Run with any Python 3, Blender is only started for the jobs:
+#   python batch_driver.py manifest.json a.blend b.blend ... --blender <blender binary> --processes 4 --report report.json
+# Every file gets its own report and log in the folder next to the report, the report joins them all.
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from workers import start_batch_job
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Transfer shape keys in many .blend files with background Blender processes")
+    parser.add_argument("manifest", help="job manifest, see batch.py")
+    parser.add_argument("files", nargs="+", help=".blend files to process")
+    parser.add_argument("--blender", default="blender", help="Blender binary")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Blender processes running at once")
+    parser.add_argument("--report", default="batch_report.json", help="report joining the reports of every file")
+    parser.add_argument("--output-directory", default="", help="save the results here instead of over the files")
+    return parser.parse_args()
+
+# run every job keeping at most process_count of them running, returns the return code of every job by its report path
+def run_pool(jobs, blender_binary, manifest_path, process_count, output_directory):
+    pending = list(jobs)
+    running = []
+    finished = {}
+    while(pending or running):
+        while(pending and len(running) < process_count):
+            blend_file, report_path = pending.pop(0)
+            # a report left by an earlier run would hide a job that stopped before writing one
+            if(os.path.isfile(report_path)):
+                os.remove(report_path)
+            output_path = os.path.join(output_directory, os.path.basename(blend_file)) if output_directory else ""
+            running.append((blend_file, report_path, start_batch_job(blender_binary, blend_file, manifest_path, report_path, output_path)))
+        time.sleep(0.5)
+        for job in list(running):
+            blend_file, report_path, process = job
+            if(process.poll() is not None):
+                running.remove(job)
+                finished[report_path] = process.returncode
+                print("%s: %s (%d/%d)" % (blend_file, "failed" if process.returncode else "done", len(finished), len(jobs)))
+    return finished
+
+
+def main():
+    args = parse_arguments()
+    job_directory = os.path.splitext(os.path.abspath(args.report))[0] + "_jobs"
+    os.makedirs(job_directory, exist_ok=True)
+    if(args.output_directory):
+        names = [os.path.basename(blend_file) for blend_file in args.files]
+        if(len(set(names)) < len(names)):
+            sys.exit("Files with the same name would be saved over each other in " + args.output_directory)
+        os.makedirs(args.output_directory, exist_ok=True)
+    # the index keeps the reports of files with the same name in different folders apart
+    jobs = []
+    for index, blend_file in enumerate(args.files):
+        name = "%d_%s.json" % (index, os.path.splitext(os.path.basename(blend_file))[0])
+        jobs.append((os.path.abspath(blend_file), os.path.join(job_directory, name)))
+
+    start = time.perf_counter()
+    finished = run_pool(jobs, args.blender, os.path.abspath(args.manifest), max(1, args.processes), os.path.abspath(args.output_directory) if args.output_directory else "")
+    reports = []
+    for blend_file, report_path in jobs:
+        report = {"file": blend_file, "failed": True, "error": "Blender stopped before writing the report, see " + os.path.splitext(report_path)[0] + ".log"}
+        if(os.path.isfile(report_path)):
+            with open(report_path) as report_file:
+                report = json.load(report_file)
+        report["returncode"] = finished[report_path]
+        reports.append(report)
+    failures = sum(1 for report in reports if report["failed"])
+    with open(args.report, "w") as report_file:
+        json.dump({"seconds": time.perf_counter() - start, "files": len(reports), "failed": failures, "reports": reports}, report_file, indent=2)
+    print("Processed %d files, %d failed, see %s" % (len(reports), failures, args.report))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+#----------------------------------------------------------
+# File benchmark.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+# Speed and accuracy benchmark of the shape key transfer engine, runs with plain CPython and numpy:
+#   python benchmark/benchmark.py --sizes 1000,10000,100000 --json results.json
+# Every case is a synthetic source and destination mesh with shape keys given by analytic
+# displacement fields, so the transferred keys are compared against the exact field at the
+# destination vertices. The stand-in mathutils trees search by brute force, so per vertex
+# modes are only run up to --max-serial-vertices.
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.util
+import numpy as np
+
+import blender_standin
+
+ADDON_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_PACKAGE = "shapekeytransfer_addon"
+
+
+# import the addon as a package with the stand-in modules in place of Blender
+def import_engine():
+    bpy = blender_standin.install()
+    if(not ADDON_PACKAGE in sys.modules):
+        spec = importlib.util.spec_from_file_location(ADDON_PACKAGE, os.path.join(ADDON_DIRECTORY, "__init__.py"),
+                                                      submodule_search_locations=[ADDON_DIRECTORY])
+        addon = importlib.util.module_from_spec(spec)
+        sys.modules[ADDON_PACKAGE] = addon
+        spec.loader.exec_module(addon)
+    return bpy, sys.modules[ADDON_PACKAGE + ".shapekeytransfer"]
+
+
+# Synthetic meshes
+# ----------------------------------------------------------
+
+# vertices and triangles of a uv sphere with about count vertices
+def uv_sphere(count, radius=1.0, rotation=0.0):
+    rings = max(int(np.sqrt(count / 2.0)), 3)
+    segments = max((count - 2) // rings, 3)
+    theta = np.linspace(0.0, np.pi, rings + 2)[1:-1]
+    phi = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False) + rotation
+    theta, phi = np.meshgrid(theta, phi, indexing="ij")
+    co = np.stack((np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)), axis=-1).reshape(-1, 3)
+    co = np.concatenate((co, [[0.0, 0.0, 1.0], [0.0, 0.0, -1.0]])) * radius
+    top, bottom = len(co) - 2, len(co) - 1
+    index = np.arange(rings * segments).reshape(rings, segments)
+    right = np.roll(index, -1, axis=1)
+    quads_a = np.stack((index[:-1], right[:-1], right[1:]), axis=-1).reshape(-1, 3)
+    quads_b = np.stack((index[:-1], right[1:], index[1:]), axis=-1).reshape(-1, 3)
+    caps_top = np.stack((np.full(segments, top), right[0], index[0]), axis=-1)
+    caps_bottom = np.stack((np.full(segments, bottom), index[-1], right[-1]), axis=-1)
+    return co.astype(np.float32), np.concatenate((quads_a, quads_b, caps_top, caps_bottom))
+
+# vertices and triangles of a square grid over [-1, 1] with about count vertices, optionally shifted by a fraction of a cell
+def grid(count, shift=0.0):
+    side = max(int(np.sqrt(count)), 2)
+    cell = 2.0 / (side - 1)
+    axis = np.linspace(-1.0, 1.0, side) + shift * cell
+    x, y = np.meshgrid(axis, axis, indexing="ij")
+    co = np.stack((x, y, np.zeros_like(x)), axis=-1).reshape(-1, 3)
+    index = np.arange(side * side).reshape(side, side)
+    triangles_a = np.stack((index[:-1, :-1], index[1:, :-1], index[1:, 1:]), axis=-1).reshape(-1, 3)
+    triangles_b = np.stack((index[:-1, :-1], index[1:, 1:], index[:-1, 1:]), axis=-1).reshape(-1, 3)
+    return co.astype(np.float32), np.concatenate((triangles_a, triangles_b))
+
+
+# Analytic shape keys, displacement of every point
+# ----------------------------------------------------------
+
+def key_bulge(co):
+    return 0.05 * np.sin(3.0 * co[:, 0:1]) * np.cos(2.0 * co[:, 1:2]) * np.array([0.3, 0.3, 1.0])
+
+def key_twist(co):
+    angle = 0.2 * (co[:, 1] + co[:, 2])
+    x = co[:, 0] * np.cos(angle) - co[:, 1] * np.sin(angle)
+    y = co[:, 0] * np.sin(angle) + co[:, 1] * np.cos(angle)
+    return np.stack((x - co[:, 0], y - co[:, 1], np.zeros_like(x)), axis=-1)
+
+# moves a small region only, like most facial shape keys
+def key_local(co):
+    weight = np.exp(-((co[:, 0] - 0.6) ** 2 + co[:, 1] ** 2) / (2.0 * 0.1 ** 2))
+    weight[weight < 1e-4] = 0.0
+    return 0.05 * weight[:, None] * np.array([0.0, 0.0, 1.0])
+
+def key_empty(co):
+    return np.zeros_like(co)
+
+KEYS = {"bulge": key_bulge, "twist": key_twist, "local": key_local, "empty": key_empty}
+
+# source and destination (vertices, triangles) of a case
+CASES = {
+    # offset sphere of a different resolution
+    "sphere": lambda count: (uv_sphere(count), uv_sphere(int(count * 1.3), radius=1.002, rotation=0.01)),
+    # finer grid shifted by a third of a cell
+    "grid": lambda count: (grid(count), grid(int(count * 1.5), shift=0.33)),
+    # same mesh, handled by the copy by vertex index
+    "identical": lambda count: (uv_sphere(count), uv_sphere(count)),
+    }
+
+# transfer modes as (name, engine settings)
+MODES = {
+    "sphere": {"transfer_mode": 'SPHERE'},
+    "sphere_numpy": {"transfer_mode": 'SPHERE', "solver_processes": 2},
+    "surface": {"transfer_mode": 'SURFACE'},
+    "nearest": {"transfer_mode": 'NEAREST', "neighbour_count": 4},
+    }
+SERIAL_MODES = ("sphere", "surface", "nearest")
+
+
+# Run one transfer with per stage timings
+# ----------------------------------------------------------
+
+# the engine method is wrapped so its time is added to timings[stage]
+def time_method(engine, name, timings, stage):
+    method = getattr(engine, name)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings[stage] += time.perf_counter() - start
+    setattr(engine, name, timed)
+
+def add_mesh(bpy, name, co, triangles, keys=None):
+    mesh = blender_standin.Mesh(name, co, triangles)
+    obj = blender_standin.Object(name, mesh)
+    if(keys is not None):
+        obj.shape_key_add(name="Basis")
+        for key_name, field in keys.items():
+            obj.shape_key_add(name=key_name).data.values[...] = co + field(co.astype(np.float64))
+    bpy.data.objects.append(obj)
+    return obj
+
+def run_case(case, mode, count, processes):
+    bpy, skt_module = import_engine()
+    bpy.data.objects.clear()
+    skt_module.MESH_USERS.invalidate()
+    (src_co, src_triangles), (dest_co, dest_triangles) = CASES[case](count)
+    src = add_mesh(bpy, "source", src_co, src_triangles, KEYS)
+    dest = add_mesh(bpy, "destination", dest_co, dest_triangles)
+
+    engine = skt_module.ShapeKeyTransfer()
+    engine.use_cache = False
+    engine.use_checkpoints = False
+    engine.skip_vertices_with_no_pair = True
+    # search steps of about one source vertex spacing
+    spacing = float(np.sqrt(np.prod(np.ptp(src_co, axis=0)[np.ptp(src_co, axis=0) > 0]) / len(src_co)))
+    engine.increment_radius = spacing
+    engine.number_of_increments = 10
+    for name, value in MODES[mode].items():
+        setattr(engine, name, value)
+    if(engine.solver_processes > 1):
+        engine.solver_processes = processes
+
+    timings = {"read": 0.0, "index": 0.0, "correspondence": 0.0, "deltas": 0.0, "apply": 0.0, "write": 0.0, "smooth": 0.0}
+    time_method(engine, "build_source_index", timings, "index")
+    time_method(engine, "read_source_deltas", timings, "deltas")
+    blender_standin.TIMERS.update(read=0.0, write=0.0)
+    start = time.perf_counter()
+    engine.begin_transfer(src.data, dest.data)
+    timings["read"] = time.perf_counter() - start
+    stages = {}
+    steps = engine.transfer_to_destination()
+    while(True):
+        step_start = time.perf_counter()
+        try:
+            next(steps)
+        except StopIteration:
+            break
+        finally:
+            stages[engine.stage] = stages.get(engine.stage, 0.0) + time.perf_counter() - step_start
+    total = time.perf_counter() - start
+    timings["correspondence"] = stages.get('SEARCH', 0.0) - timings["index"]
+    timings["smooth"] = stages.get('SMOOTH', 0.0)
+    timings["write"] = blender_standin.TIMERS["write"]
+    timings["apply"] = stages.get('APPLY', 0.0) + stages.get(None, 0.0) - timings["deltas"] - timings["write"]
+
+    # error of every key against the exact displacement at the destination vertices
+    errors = {}
+    matched = engine.correspondence.matched if engine.correspondence is not None else np.zeros(len(dest_co), dtype=bool)
+    for key_name, field in KEYS.items():
+        if(engine.failed or not key_name in dest.data.shape_keys.key_blocks):
+            continue
+        truth = dest_co.astype(np.float64) + field(dest_co.astype(np.float64))
+        error = np.sqrt(((dest.data.shape_keys.key_blocks[key_name].data.values - truth) ** 2).sum(axis=1))[matched]
+        errors[key_name] = {
+            "max": float(error.max()) if len(error) else 0.0,
+            "mean": float(error.mean()) if len(error) else 0.0,
+            "rms": float(np.sqrt((error ** 2).mean())) if len(error) else 0.0,
+            }
+    return {
+        "case": case,
+        "mode": mode,
+        "source_vertices": len(src_co),
+        "destination_vertices": len(dest_co),
+        "unmatched_vertices": int(len(dest_co) - np.count_nonzero(matched)),
+        "failed": engine.failed,
+        "message": engine.message,
+        "total": total,
+        "timings": timings,
+        "errors": errors,
+        }
+
+
+# Command line
+# ----------------------------------------------------------
+
+def print_result(result):
+    timings = " ".join("%s %.3fs" % (stage, seconds) for stage, seconds in result["timings"].items() if seconds > 0.0005)
+    print("%-9s %-12s %8d -> %8d  total %8.3fs | %s" % (result["case"], result["mode"], result["source_vertices"],
+                                                       result["destination_vertices"], result["total"], timings))
+    if(result["failed"]):
+        print("    failed: " + result["message"])
+    for key_name, error in result["errors"].items():
+        print("    %-6s max %.2e  mean %.2e  rms %.2e" % (key_name, error["max"], error["mean"], error["rms"]))
+    if(result["unmatched_vertices"]):
+        print("    unmatched vertices: %d" % result["unmatched_vertices"])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the shape key transfer on synthetic meshes with analytic shape keys.")
+    parser.add_argument("--sizes", default="1000,10000", help="comma separated source vertex counts, for example 1000,10000,100000,1000000")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma separated cases: " + ", ".join(CASES))
+    parser.add_argument("--modes", default=",".join(MODES), help="comma separated modes: " + ", ".join(MODES))
+    parser.add_argument("--processes", type=int, default=2, help="processes of the numpy sphere solver")
+    parser.add_argument("--max-serial-vertices", type=int, default=20000, help="largest size run with the per vertex modes")
+    parser.add_argument("--json", default="", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for count in [int(size) for size in args.sizes.split(",")]:
+        for case in args.cases.split(","):
+            # identical meshes never search, one mode is enough
+            modes = ["sphere"] if case == "identical" else args.modes.split(",")
+            for mode in modes:
+                if(mode in SERIAL_MODES and case != "identical" and count > args.max_serial_vertices):
+                    print("%-9s %-12s %8d skipped, above --max-serial-vertices" % (case, mode, count))
+                    continue
+                result = run_case(case, mode, count, args.processes)
+                print_result(result)
+                results.append(result)
+    if(args.json):
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if not any(result["failed"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
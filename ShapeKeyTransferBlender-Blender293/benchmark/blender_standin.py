@@ -0,0 +1,393 @@
+#----------------------------------------------------------
+# File blender_standin.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+# The small part of bpy, bmesh and mathutils the transfer engine uses, written with numpy
+# so the addon can be imported and benchmarked by plain CPython without Blender.
+# install() registers the modules in sys.modules, it has to run before the addon is imported.
+
+import sys
+import time
+import types
+import numpy as np
+
+# seconds spent in bulk reads and writes of coordinates, reset by the benchmark
+TIMERS = {"read": 0.0, "write": 0.0}
+
+
+# mathutils
+# ----------------------------------------------------------
+
+class Vector:
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self.values = np.array(values, dtype=np.float64).reshape(-1)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __iter__(self):
+        return iter(self.values.tolist())
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __add__(self, other):
+        return Vector(self.values + np.asarray(other, dtype=np.float64))
+
+    def __sub__(self, other):
+        return Vector(self.values - np.asarray(other, dtype=np.float64))
+
+    @property
+    def length(self):
+        return float(np.sqrt((self.values ** 2).sum()))
+
+
+class Matrix:
+    def __init__(self, rows=None):
+        self.values = np.identity(4) if rows is None else np.array(rows, dtype=np.float64)
+
+    @classmethod
+    def Translation(cls, offset):
+        matrix = cls()
+        matrix.values[:3, 3] = offset
+        return matrix
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def __iter__(self):
+        return iter([Vector(row) for row in self.values])
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and np.array_equal(self.values, other.values)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def inverted(self):
+        return Matrix(np.linalg.inv(self.values))
+
+    def to_3x3(self):
+        return Matrix(self.values[:3, :3])
+
+    def __matmul__(self, other):
+        if(isinstance(other, Matrix)):
+            return Matrix(self.values @ other.values)
+        co = np.asarray(other, dtype=np.float64)
+        if(len(self.values) == 4):
+            return Vector(self.values[:3, :3] @ co + self.values[:3, 3])
+        return Vector(self.values @ co)
+
+
+class KDTree:
+    """Brute force search over a numpy array with the results of mathutils.kdtree.KDTree"""
+    def __init__(self, size):
+        self.inserted = []
+        self.points   = np.zeros((0, 3))
+        self.indices  = np.zeros(0, dtype=np.int64)
+
+    def insert(self, co, index):
+        self.inserted.append((tuple(co), index))
+
+    def balance(self):
+        if(self.inserted):
+            self.points  = np.array([co for co, index in self.inserted], dtype=np.float64)
+            self.indices = np.array([index for co, index in self.inserted], dtype=np.int64)
+        self.inserted = []
+
+    def get_distances(self, co):
+        return np.sqrt(((self.points - np.asarray(co, dtype=np.float64)) ** 2).sum(axis=1))
+
+    def get_results(self, rows, distances):
+        return [(Vector(self.points[row]), int(self.indices[row]), float(distances[row])) for row in rows]
+
+    def find(self, co):
+        if(len(self.points) == 0):
+            return None, None, None
+        distances = self.get_distances(co)
+        return self.get_results([int(np.argmin(distances))], distances)[0]
+
+    def find_range(self, co, radius):
+        distances = self.get_distances(co)
+        rows = np.flatnonzero(distances <= radius)
+        return self.get_results(rows[np.argsort(distances[rows], kind="stable")], distances)
+
+    def find_n(self, co, n):
+        distances = self.get_distances(co)
+        return self.get_results(np.argsort(distances, kind="stable")[:n], distances)
+
+
+# closest points on triangles a, b, c (all (t, 3) arrays) to one point p
+def closest_points_on_triangles(p, a, b, c):
+    ab = b - a
+    ac = c - a
+    ap = p - a
+    d1 = (ab * ap).sum(axis=1)
+    d2 = (ac * ap).sum(axis=1)
+    bp = p - b
+    d3 = (ab * bp).sum(axis=1)
+    d4 = (ac * bp).sum(axis=1)
+    cp = p - c
+    d5 = (ab * cp).sum(axis=1)
+    d6 = (ac * cp).sum(axis=1)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        denom = 1.0 / (va + vb + vc)
+        result = a + ab * (vb * denom)[:, None] + ac * (vc * denom)[:, None]
+        # the regions outside the triangle, from the last to the first so corners win over edges
+        edge_bc = (va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0)
+        w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        result = np.where(edge_bc[:, None], b + (c - b) * w[:, None], result)
+        edge_ac = (vb <= 0) & (d2 >= 0) & (d6 <= 0)
+        w = d2 / (d2 - d6)
+        result = np.where(edge_ac[:, None], a + ac * w[:, None], result)
+        edge_ab = (vc <= 0) & (d1 >= 0) & (d3 <= 0)
+        w = d1 / (d1 - d3)
+        result = np.where(edge_ab[:, None], a + ab * w[:, None], result)
+    result = np.where(((d6 >= 0) & (d5 <= d6))[:, None], c, result)
+    result = np.where(((d3 >= 0) & (d4 <= d3))[:, None], b, result)
+    result = np.where(((d1 <= 0) & (d2 <= 0))[:, None], a, result)
+    return result
+
+
+class BVHTree:
+    """Closest point on triangles with the results of mathutils.bvhtree.BVHTree.find_nearest"""
+    def __init__(self, vertices, polygons):
+        co = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        triangles = np.asarray(polygons, dtype=np.int64).reshape(-1, 3)
+        self.corners = [co[triangles[:, i]] for i in range(3)]
+        self.centers = sum(self.corners) / 3.0
+        self.radii = np.max([np.sqrt(((corner - self.centers) ** 2).sum(axis=1)) for corner in self.corners], axis=0) if len(triangles) else np.zeros(0)
+
+    @classmethod
+    def FromPolygons(cls, vertices, polygons, all_triangles=False, epsilon=0.0):
+        return cls(vertices, polygons)
+
+    def find_nearest(self, co, distance=np.inf):
+        if(len(self.centers) == 0):
+            return None, None, None, None
+        p = np.asarray(co, dtype=np.float64)
+        center_distances = np.sqrt(((self.centers - p) ** 2).sum(axis=1))
+        # the center lies on its triangle, so no triangle further away than the closest center minus its radius can be nearer
+        candidates = np.flatnonzero(center_distances - self.radii <= center_distances.min())
+        points = closest_points_on_triangles(p, *(corner[candidates] for corner in self.corners))
+        distances = np.sqrt(((points - p) ** 2).sum(axis=1))
+        best = int(np.argmin(distances))
+        if(distances[best] > distance):
+            return None, None, None, None
+        a, b, c = (corner[candidates[best]] for corner in self.corners)
+        normal = np.cross(b - a, c - a)
+        normal /= max(np.linalg.norm(normal), 1e-12)
+        return Vector(points[best]), Vector(normal), int(candidates[best]), float(distances[best])
+
+
+# Mesh data with bulk access like bpy collections
+# ----------------------------------------------------------
+
+class BulkCollection:
+    """Collection with one (n, width) array attribute read and written by foreach_get and foreach_set"""
+    def __init__(self, attribute, values):
+        self.attribute = attribute
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def foreach_get(self, attribute, out):
+        start = time.perf_counter()
+        out[...] = self.values.reshape(-1)
+        TIMERS["read"] += time.perf_counter() - start
+
+    def foreach_set(self, attribute, values):
+        start = time.perf_counter()
+        self.values[...] = np.asarray(values).reshape(self.values.shape)
+        TIMERS["write"] += time.perf_counter() - start
+
+
+class ShapeKey:
+    def __init__(self, name, co):
+        self.name = name
+        self.data = BulkCollection("co", np.array(co, dtype=np.float32))
+
+
+class KeyBlocks:
+    def __init__(self):
+        self.blocks = []
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def __iter__(self):
+        return iter(list(self.blocks))
+
+    def __contains__(self, name):
+        return any(block.name == name for block in self.blocks)
+
+    def __getitem__(self, key):
+        if(isinstance(key, int)):
+            return self.blocks[key]
+        for block in self.blocks:
+            if(block.name == key):
+                return block
+        raise KeyError(key)
+
+
+class Key:
+    def __init__(self):
+        self.key_blocks = KeyBlocks()
+        # custom (ID) properties of the datablock
+        self.properties = {}
+
+    @property
+    def reference_key(self):
+        return self.key_blocks.blocks[0]
+
+    def get(self, name, default=None):
+        return self.properties.get(name, default)
+
+    def __getitem__(self, name):
+        return self.properties[name]
+
+    def __setitem__(self, name, value):
+        self.properties[name] = dict(value) if isinstance(value, dict) else value
+
+    def __contains__(self, name):
+        return name in self.properties
+
+
+class Mesh:
+    def __init__(self, name, co, triangles):
+        self.name = name
+        triangles = np.asarray(triangles, dtype=np.int32).reshape(-1, 3)
+        edges = np.concatenate((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]))
+        edges = np.unique(np.sort(edges, axis=1), axis=0).astype(np.int32)
+        self.vertices = BulkCollection("co", np.array(co, dtype=np.float32).reshape(-1, 3))
+        self.edges = BulkCollection("vertices", edges)
+        self.loop_triangles = BulkCollection("vertices", triangles)
+        self.shape_keys = None
+
+    def calc_loop_triangles(self):
+        pass
+
+    def as_pointer(self):
+        return id(self)
+
+
+class Object:
+    def __init__(self, name, mesh, matrix_world=None):
+        self.name = name
+        self.type = 'MESH'
+        self.data = mesh
+        self.matrix_world = matrix_world or Matrix()
+        self.vertex_groups = {}
+
+    # there is no evaluated copy, depsgraph updates carry the object itself
+    @property
+    def original(self):
+        return self
+
+    def as_pointer(self):
+        return id(self)
+
+    def shape_key_add(self, name="Key", from_mix=True):
+        if(self.data.shape_keys is None):
+            self.data.shape_keys = Key()
+        blocks = self.data.shape_keys.key_blocks.blocks
+        co = blocks[0].data.values if blocks else self.data.vertices.values
+        block = ShapeKey(name, co)
+        blocks.append(block)
+        return block
+
+    def shape_key_remove(self, key):
+        blocks = self.data.shape_keys.key_blocks.blocks
+        blocks.remove(key)
+        if(not blocks):
+            self.data.shape_keys = None
+
+    def shape_key_clear(self):
+        self.data.shape_keys = None
+
+
+# Module stand-ins
+# ----------------------------------------------------------
+
+def property_function(*args, **kwargs):
+    return None
+
+def persistent(function):
+    return function
+
+def install():
+    """Register the stand-in modules, returns the bpy stand-in"""
+    if("bpy" in sys.modules and getattr(sys.modules["bpy"], "is_standin", False)):
+        return sys.modules["bpy"]
+
+    bpy = types.ModuleType("bpy")
+    bpy.is_standin = True
+    bpy.types = types.ModuleType("bpy.types")
+    for name in ("Operator", "UIList", "Panel", "PropertyGroup", "Mesh", "Object", "Collection", "Scene", "Key"):
+        setattr(bpy.types, name, type(name, (), {}))
+    # the stand-in data classes, so type checks on datablocks work
+    bpy.types.Mesh = Mesh
+    bpy.types.Object = Object
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("StringProperty", "BoolProperty", "EnumProperty", "IntProperty", "FloatProperty",
+                 "PointerProperty", "CollectionProperty", "FloatVectorProperty", "IntVectorProperty"):
+        setattr(bpy.props, name, property_function)
+    bpy.utils = types.ModuleType("bpy.utils")
+    bpy.utils.register_class = bpy.utils.unregister_class = lambda cls: None
+    bpy.app = types.ModuleType("bpy.app")
+    bpy.app.binary_path = ""
+    bpy.app.handlers = types.ModuleType("bpy.app.handlers")
+    bpy.app.handlers.persistent = persistent
+    for name in ("depsgraph_update_post", "undo_post", "redo_post", "load_post"):
+        setattr(bpy.app.handlers, name, [])
+    bpy.path = types.ModuleType("bpy.path")
+    bpy.path.abspath = lambda path: path
+    bpy.data = types.SimpleNamespace(objects=[])
+    bpy.context = types.SimpleNamespace(view_layer=types.SimpleNamespace(objects=types.SimpleNamespace(active=None)))
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = Vector
+    mathutils.Matrix = Matrix
+    mathutils.kdtree = types.ModuleType("mathutils.kdtree")
+    mathutils.kdtree.KDTree = KDTree
+    mathutils.bvhtree = types.ModuleType("mathutils.bvhtree")
+    mathutils.bvhtree.BVHTree = BVHTree
+
+    sys.modules.update({
+        "bpy": bpy,
+        "bpy.types": bpy.types,
+        "bpy.props": bpy.props,
+        "bpy.utils": bpy.utils,
+        "bpy.app": bpy.app,
+        "bpy.app.handlers": bpy.app.handlers,
+        "bpy.path": bpy.path,
+        "bmesh": types.ModuleType("bmesh"),
+        "mathutils": mathutils,
+        "mathutils.kdtree": mathutils.kdtree,
+        "mathutils.bvhtree": mathutils.bvhtree,
+        })
+    return bpy
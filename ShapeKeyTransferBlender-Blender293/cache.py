@@ -0,0 +1,160 @@
+#----------------------------------------------------------
+# File cache.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+import os
+import hashlib
+import tempfile
+import numpy as np
+
+from . correspondence import Correspondence
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(tempfile.gettempdir(), "shapekeytransfer_cache")
+CACHE_EXTENSION = ".npz"
+
+
+# Fingerprint of everything the correspondence depends on
+# ----------------------------------------------------------
+
+def fingerprint(arrays, settings):
+    """Hash of the given arrays (basis coordinates, matrices) and a dict of transfer settings"""
+    digest = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+    digest.update(repr(sorted(settings.items())).encode())
+    return digest.hexdigest()
+
+
+# Read and write one correspondence as a .npz file
+# ----------------------------------------------------------
+
+def load_correspondence(path, key):
+    """Return the correspondence stored at path or None if it is missing, unreadable or for another key"""
+    if(not os.path.isfile(path)):
+        return None
+    try:
+        with np.load(path) as data:
+            if(str(data["fingerprint"]) != key):
+                return None
+            return Correspondence(data["offsets"], data["indices"], data["weights"])
+    except (OSError, ValueError, KeyError):
+        # unreadable or truncated entry, it will be overwritten
+        return None
+
+def save_correspondence(path, key, correspondence):
+    # write to a temporary file first so an interrupted save never leaves a truncated entry
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f,
+                 fingerprint=np.array(key),
+                 offsets=correspondence.offsets,
+                 indices=correspondence.indices,
+                 weights=correspondence.weights)
+    os.replace(temp_path, path)
+
+
+# Directory of stored correspondences
+# ----------------------------------------------------------
+
+class CorrespondenceCache:
+    """
+    Stores computed correspondences as .npz files named by their fingerprint.
+
+    Entries of changed meshes or settings never match again and are evicted,
+    least recently used first, once there are more than max_entries files.
+    """
+    def __init__(self, directory="", max_entries=32):
+        self.directory   = directory or DEFAULT_CACHE_DIRECTORY
+        self.max_entries = max_entries
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key + CACHE_EXTENSION)
+
+    # return the stored correspondence or None
+    def load(self, key):
+        path = self.get_path(key)
+        result = load_correspondence(path, key)
+        if(result is not None):
+            # mark as recently used
+            os.utime(path)
+        return result
+
+    def save(self, key, correspondence):
+        os.makedirs(self.directory, exist_ok=True)
+        save_correspondence(self.get_path(key), key, correspondence)
+        self.evict()
+
+    # remove the least recently used entries above max_entries
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if(name.endswith(CACHE_EXTENSION)):
+                path = os.path.join(self.directory, name)
+                entries.append((os.path.getmtime(path), path))
+        entries.sort(reverse=True)
+        for mtime, path in entries[self.max_entries:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        if(not os.path.isdir(self.directory)):
+            return 0
+        removed = 0
+        for name in os.listdir(self.directory):
+            if(name.endswith(CACHE_EXTENSION)):
+                os.remove(os.path.join(self.directory, name))
+                removed += 1
+        return removed
+
+
+# Directory of finished vertex ranges of unfinished correspondences
+# ----------------------------------------------------------
+
+class CheckpointStore:
+    """
+    Stores the correspondence of every finished chunk of destination vertices.
+
+    Files are named <fingerprint>_<first vertex>_<end vertex>.npz so chunks computed
+    by an interrupted run or by separate worker processes can be picked up and merged.
+    """
+    def __init__(self, directory=""):
+        self.directory = directory or os.path.join(DEFAULT_CACHE_DIRECTORY, "checkpoints")
+
+    def get_path(self, key, start, end):
+        return os.path.join(self.directory, "%s_%d_%d%s" % (key, start, end, CACHE_EXTENSION))
+
+    def load(self, key, start, end):
+        return load_correspondence(self.get_path(key, start, end), key)
+
+    def save(self, key, start, end, correspondence):
+        os.makedirs(self.directory, exist_ok=True)
+        save_correspondence(self.get_path(key, start, end), key, correspondence)
+
+    # remove all chunks of one correspondence
+    def clear(self, key):
+        if(not os.path.isdir(self.directory)):
+            return
+        for name in os.listdir(self.directory):
+            if(name.startswith(key + "_") and name.endswith(CACHE_EXTENSION)):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,480 @@
+#----------------------------------------------------------
+# File correspondence.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+# This module only depends on numpy so it can be used outside of Blender.
+# It is also run as a script by the processes of ParallelSolver.
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+from multiprocessing import shared_memory
+
+
+# Sum consecutive row segments of values, empty segments give zero
+# ----------------------------------------------------------
+
+def segment_sum(values, offsets, out=None):
+    count = len(offsets) - 1
+    if(out is None):
+        result = np.zeros((count,) + values.shape[1:], dtype=values.dtype)
+    else:
+        result = out
+        result.fill(0)
+    starts = offsets[:-1]
+    non_empty = starts < offsets[1:]
+    if(values.shape[0] and non_empty.any()):
+        result[non_empty] = np.add.reduceat(values, starts[non_empty], axis=0)
+    return result
+
+
+# Barycentric coordinates of points lying on triangles a, b, c (all (n, 3) arrays)
+# ----------------------------------------------------------
+
+def barycentric_weights(points, a, b, c):
+    v0 = b - a
+    v1 = c - a
+    v2 = points - a
+    d00 = (v0 * v0).sum(axis=1)
+    d01 = (v0 * v1).sum(axis=1)
+    d11 = (v1 * v1).sum(axis=1)
+    d20 = (v2 * v0).sum(axis=1)
+    d21 = (v2 * v1).sum(axis=1)
+    denom = d00 * d11 - d01 * d01
+    degenerate = np.abs(denom) <= 1e-12
+    denom[degenerate] = 1.0
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    weights = np.stack((1.0 - v - w, v, w), axis=1)
+    # zero area triangles blend their corners equally
+    weights[degenerate] = 1.0 / 3.0
+    # points are on the triangle, only rounding can leave its edges
+    weights = np.clip(weights, 0.0, None)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+# Normalized (n, k) weights of k neighbours from their (n, k) distances
+# ----------------------------------------------------------
+
+def neighbour_weights(distances, valid, weighting='INVERSE_DISTANCE', radius=1.0):
+    """
+    INVERSE_DISTANCE weights by 1 / distance², GAUSSIAN by exp(-distance² / (2 radius²)).
+    Neighbours where valid is False get weight 0, rows without any valid neighbour stay 0.
+    """
+    d2 = np.where(valid, distances.astype(np.float64) ** 2, np.inf)
+    nearest = d2.min(axis=1, keepdims=True)
+    if(weighting == 'GAUSSIAN'):
+        # relative to the nearest neighbour so far away rows do not underflow to 0
+        weights = np.exp(-(d2 - np.where(np.isfinite(nearest), nearest, 0.0)) / (2.0 * max(radius, 1e-12) ** 2))
+    else:
+        weights = 1.0 / (d2 + 1e-12)
+    weights[~valid] = 0.0
+    total = weights.sum(axis=1, keepdims=True)
+    total[total == 0] = 1.0
+    return (weights / total).astype(np.float32)
+
+
+# Destination to source vertex mapping
+# ----------------------------------------------------------
+
+class Correspondence:
+    """
+    Weighted mapping from every destination vertex to source vertices.
+
+    Destination vertex i uses the source vertices indices[offsets[i]:offsets[i + 1]]
+    with the matching weights. Vertices without a partner have an empty row.
+    """
+    def __init__(self, offsets, indices, weights):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        # every row has the same number of source vertices, as built by from_fixed_width without unpaired vertices
+        counts = np.diff(self.offsets)
+        self.width = int(counts[0]) if len(counts) and counts[0] > 0 and (counts == counts[0]).all() else None
+
+    # build from one list of source indices and one list of weights per destination vertex
+    @classmethod
+    def from_lists(cls, chosen_vertices, vertex_weights):
+        offsets = np.zeros(len(chosen_vertices) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(chosen) for chosen in chosen_vertices])
+        indices = [index for chosen in chosen_vertices for index in chosen]
+        weights = [weight for row in vertex_weights for weight in row]
+        return cls(offsets, indices, weights)
+
+    # build from (n, k) index and weight arrays, rows where matched is False are left empty
+    @classmethod
+    def from_fixed_width(cls, indices, weights, matched):
+        width = indices.shape[1]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.where(matched, width, 0))
+        return cls(offsets, indices[matched].ravel(), weights[matched].ravel())
+
+    # mapping of count destination vertices built from (first row, Correspondence) parts covering separate row ranges
+    @classmethod
+    def merge(cls, count, parts):
+        counts  = np.zeros(count, dtype=np.int64)
+        indices = []
+        weights = []
+        for start, part in sorted(parts, key=lambda item: item[0]):
+            counts[start:start + part.count] = np.diff(part.offsets)
+            indices.append(part.indices)
+            weights.append(part.weights)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        if(not parts):
+            return cls(offsets, [], [])
+        return cls(offsets, np.concatenate(indices), np.concatenate(weights))
+
+    # number of destination vertices
+    @property
+    def count(self):
+        return len(self.offsets) - 1
+
+    # boolean array of destination vertices which found a partner
+    @property
+    def matched(self):
+        return self.offsets[:-1] < self.offsets[1:]
+
+    # weighted sum of per source vertex values for the destination vertices rows only, written to out when given
+    def blend_rows(self, values, rows, out=None):
+        extra_axes = (1,) * (values.ndim - 1)
+        if(self.width):
+            # fixed width rows are one (rows, k) gather summed over k
+            indices = self.indices.reshape(-1, self.width)[rows]
+            weights = self.weights.reshape(-1, self.width)[rows]
+            return (values[indices] * weights.reshape(weights.shape + extra_axes)).sum(axis=1, out=out)
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+        positions = expand_ranges(starts, counts)
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        gathered = values[self.indices[positions]] * self.weights[positions].reshape((-1,) + extra_axes)
+        return segment_sum(gathered, offsets, out)
+
+    # same mapping with the rows where keep is False left empty
+    def keep_rows(self, keep):
+        counts = np.where(keep, np.diff(self.offsets), 0)
+        positions = np.repeat(keep, np.diff(self.offsets))
+        offsets = np.zeros(len(self.offsets), dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        return Correspondence(offsets, self.indices[positions], self.weights[positions])
+
+    # mapping of count destination vertices where vertex rows[i] takes row i of this mapping, the others are left empty
+    def scatter_rows(self, rows, count):
+        counts = np.zeros(count, dtype=np.int64)
+        counts[rows] = np.diff(self.offsets)
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(counts)
+        return Correspondence(offsets, self.indices, self.weights)
+
+    # boolean array of destination vertices using at least one source vertex where mask is True
+    def touches(self, mask):
+        return segment_sum(mask[self.indices].astype(np.int32), self.offsets) > 0
+
+
+# Expand (start, count) ranges into one array of all their indices
+# ----------------------------------------------------------
+
+def expand_ranges(starts, counts):
+    total = int(counts.sum())
+    if(total == 0):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.cumsum(counts)
+    return np.arange(total) - np.repeat(ends - counts, counts) + np.repeat(starts, counts)
+
+
+# Integer offsets of the cells around a cell
+# ----------------------------------------------------------
+
+def cube_offsets(k):
+    """All cells at most k cells away on every axis"""
+    r = np.arange(-k, k + 1)
+    return np.stack(np.meshgrid(r, r, r, indexing="ij"), axis=-1).reshape(-1, 3)
+
+def ring_offsets(k):
+    """Cells exactly k cells away on at least one axis"""
+    cube = cube_offsets(k)
+    return cube[np.abs(cube).max(axis=1) == k]
+
+
+# Uniform grid over a point set for nearest and radius queries
+# ----------------------------------------------------------
+
+# cell size giving a few points per cell while keeping searches up to max_distance within a few rings
+def choose_cell_size(points, max_distance):
+    if(len(points) == 0):
+        return 1.0
+    extent = float((points.max(axis=0) - points.min(axis=0)).max())
+    cell_size = max(extent / max(len(points), 1) ** (1.0 / 3.0), max_distance / 16.0)
+    return cell_size if cell_size > 0 else 1.0
+
+class PointGrid:
+    """
+    Points sorted by the uniform grid cell containing them.
+
+    The points of one cell are order[start:start + count] where start and count
+    come from get_cell_ranges, so queries only look at the cells around them.
+    """
+    def __init__(self, points, cell_size):
+        self.points    = np.asarray(points, dtype=np.float32)
+        self.cell_size = cell_size
+        self.origin    = self.points.min(axis=0) if len(self.points) else np.zeros(3, dtype=np.float32)
+        cells = self.get_cells(self.points)
+        self.shape = cells.max(axis=0) + 1 if len(cells) else np.ones(3, dtype=np.int64)
+        keys = self.get_keys(cells)
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def get_cells(self, points):
+        return np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+    def get_keys(self, cells):
+        return (cells[:, 0] * self.shape[1] + cells[:, 1]) * self.shape[2] + cells[:, 2]
+
+    # start in order and number of points of every cell, cells outside the grid are empty
+    def get_cell_ranges(self, cells):
+        inside = np.all((cells >= 0) & (cells < self.shape), axis=1)
+        keys = self.get_keys(np.clip(cells, 0, self.shape - 1))
+        starts = np.searchsorted(self.sorted_keys, keys, "left")
+        ends   = np.searchsorted(self.sorted_keys, keys, "right")
+        return starts, np.where(inside, ends - starts, 0)
+
+    # points in the cells at the given offsets around every query cell as (query row, point index) pairs
+    def gather(self, query_cells, offsets):
+        cells = (query_cells[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+        starts, counts = self.get_cell_ranges(cells)
+        rows = np.repeat(np.repeat(np.arange(len(query_cells)), len(offsets)), counts)
+        return rows, self.order[expand_ranges(starts, counts)]
+
+    # squared distances between the gathered points and their queries
+    def get_squared_distances(self, queries, rows, candidates):
+        return ((self.points[candidates].astype(np.float64) - queries[rows]) ** 2).sum(axis=1)
+
+    def find_nearest(self, queries, max_distance):
+        """
+        Nearest point of every query within max_distance searching ring by ring.
+
+        Returns the point indices (-1 when nothing is in range) and squared distances.
+        On equal distances the highest index wins like the linear scan of the original transfer.
+        """
+        queries = np.asarray(queries, dtype=np.float64)
+        best_d2 = np.full(len(queries), np.inf)
+        best_index = np.full(len(queries), -1, dtype=np.int64)
+        if(len(self.points) == 0):
+            return best_index, best_d2
+        query_cells = self.get_cells(queries)
+        active = np.arange(len(queries))
+        k = 0
+        while(len(active)):
+            rows, candidates = self.gather(query_cells[active], ring_offsets(k))
+            if(len(candidates)):
+                d2 = self.get_squared_distances(queries[active], rows, candidates)
+                # rows come out of gather sorted, so every query is one segment
+                starts = np.flatnonzero(np.append(True, rows[1:] != rows[:-1]))
+                segment_d2 = np.minimum.reduceat(d2, starts)
+                closest = d2 == np.repeat(segment_d2, np.diff(np.append(starts, len(d2))))
+                candidates = np.maximum.reduceat(np.where(closest, candidates, -1), starts)
+                q, d2 = active[rows[starts]], segment_d2
+                better = (d2 < best_d2[q]) | ((d2 == best_d2[q]) & (candidates > best_index[q]))
+                best_d2[q[better]] = d2[better]
+                best_index[q[better]] = candidates[better]
+            # every point closer than k cells has been seen now
+            reach = k * self.cell_size
+            done = (best_d2[active] <= reach * reach) | (reach >= max_distance)
+            active = active[~done]
+            k += 1
+        out_of_range = best_d2 > max_distance * max_distance
+        best_index[out_of_range] = -1
+        best_d2[out_of_range] = np.inf
+        return best_index, best_d2
+
+    def find_in_radius(self, queries, radius):
+        """All (query row, point index) pairs within the per query radius, sorted by row then index"""
+        queries = np.asarray(queries, dtype=np.float64)
+        query_cells = self.get_cells(queries)
+        extents = np.ceil(radius / self.cell_size).astype(np.int64)
+        all_rows = [np.zeros(0, dtype=np.int64)]
+        all_indices = [np.zeros(0, dtype=np.int64)]
+        for k in np.unique(extents):
+            selected = np.flatnonzero(extents == k)
+            rows, candidates = self.gather(query_cells[selected], cube_offsets(int(k)))
+            d2 = self.get_squared_distances(queries[selected], rows, candidates)
+            keep = d2 <= radius[selected][rows] ** 2
+            all_rows.append(selected[rows[keep]])
+            all_indices.append(candidates[keep])
+        rows = np.concatenate(all_rows)
+        indices = np.concatenate(all_indices)
+        order = np.lexsort((indices, rows))
+        return rows[order], indices[order]
+
+
+# Growing sphere search of the transfer on a PointGrid
+# ----------------------------------------------------------
+
+def solve_sphere_rows(grid, points, radii, use_one_vertex, batch_size=32768):
+    """
+    Correspondence of points (in the space of the grid) like the selection sphere of the transfer.
+
+    radii are the growing sphere radii, starting with 0. The first radius reaching any grid point
+    selects either the closest point or all points within it weighted equally.
+    Points are matched in batches to bound the size of the temporary arrays.
+    """
+    if(len(points) > batch_size):
+        parts = []
+        for start in range(0, len(points), batch_size):
+            parts.append((start, solve_sphere_rows(grid, points[start:start + batch_size], radii, use_one_vertex, batch_size)))
+        return Correspondence.merge(len(points), parts)
+    radii = np.asarray(radii, dtype=np.float64)
+    count = len(points)
+    nearest, d2 = grid.find_nearest(points, radii[-1])
+    matched = nearest >= 0
+    if(use_one_vertex):
+        return Correspondence.from_fixed_width(nearest[:, None], np.ones((count, 1), dtype=np.float32), matched)
+    rows = np.flatnonzero(matched)
+    # first sphere reaching the closest point
+    levels = np.searchsorted(radii * radii, d2[rows], "left")
+    selected_rows, indices = grid.find_in_radius(points[rows], radii[levels])
+    selected_rows = rows[selected_rows]
+    counts = np.bincount(selected_rows, minlength=count)
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    return Correspondence(offsets, indices, 1.0 / counts[selected_rows])
+
+
+# Run solve_sphere_rows for separate row ranges in separate processes
+# ----------------------------------------------------------
+
+def attach_shared_array(info):
+    """Return the shared memory block described by info and an array view of it"""
+    try:
+        block = shared_memory.SharedMemory(name=info["name"], track=False)
+    except TypeError:
+        # before Python 3.13 every attaching process would also unlink the block on exit
+        block = shared_memory.SharedMemory(name=info["name"])
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block, np.ndarray(info["shape"], dtype=np.float32, buffer=block.buf)
+
+def get_output_path(directory, start, end):
+    return os.path.join(directory, "rows_%d_%d.npz" % (start, end))
+
+class ParallelSolver:
+    """
+    Matches row ranges of dest_points to src_points in separate Python processes.
+
+    Both point sets are shared with the processes through multiprocessing.shared_memory.
+    Every process builds its own PointGrid and writes the Correspondence of each of its
+    ranges to a .npz file in a temporary directory, which poll picks up.
+    """
+    def __init__(self, src_points, dest_points, radii, use_one_vertex, processes, python_executable=None):
+        self.radii          = [float(r) for r in radii]
+        self.use_one_vertex = bool(use_one_vertex)
+        self.processes      = processes
+        self.python_executable = python_executable or sys.executable
+        self.blocks         = []
+        self.running        = []
+        self.pending        = []
+        self.output_directory = tempfile.mkdtemp(prefix="shapekeytransfer_solver_")
+        self.src  = self.share(src_points)
+        self.dest = self.share(dest_points)
+
+    def share(self, array):
+        array = np.ascontiguousarray(array, dtype=np.float32)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.blocks.append(block)
+        np.ndarray(array.shape, dtype=np.float32, buffer=block.buf)[:] = array
+        return {"name": block.name, "shape": list(array.shape)}
+
+    # start the processes, ranges are dealt out in turn so every process gets a similar share
+    def start(self, ranges):
+        self.pending = [tuple(r) for r in ranges]
+        for i in range(min(self.processes, len(self.pending))):
+            job = {
+                "src": self.src,
+                "dest": self.dest,
+                "radii": self.radii,
+                "use_one_vertex": self.use_one_vertex,
+                "ranges": self.pending[i::self.processes],
+                "output_directory": self.output_directory,
+                }
+            log = open(os.path.join(self.output_directory, "process_%d.log" % (i)), "w")
+            self.running.append(subprocess.Popen([self.python_executable, os.path.abspath(__file__), json.dumps(job)],
+                                                 stdout=log, stderr=subprocess.STDOUT))
+            log.close()
+
+    # (start, end, Correspondence) of the ranges finished since the last call
+    def poll(self):
+        processes_exited = all(process.poll() is not None for process in self.running)
+        finished = []
+        for start, end in list(self.pending):
+            path = get_output_path(self.output_directory, start, end)
+            if(os.path.isfile(path)):
+                with np.load(path) as data:
+                    finished.append((start, end, Correspondence(data["offsets"], data["indices"], data["weights"])))
+                os.remove(path)
+                self.pending.remove((start, end))
+        if(self.pending and processes_exited):
+            raise RuntimeError("A solver process failed, see the logs in " + self.output_directory)
+        return finished
+
+    # stop the processes and release the shared memory, the logs are kept after a failure
+    def close(self):
+        for process in self.running:
+            if(process.poll() is None):
+                process.terminate()
+                process.wait()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+        if(not self.pending):
+            shutil.rmtree(self.output_directory, ignore_errors=True)
+
+
+# Entry point of one solver process
+# ----------------------------------------------------------
+
+def run_solver_process(job):
+    src_block, src_points = attach_shared_array(job["src"])
+    dest_block, dest_points = attach_shared_array(job["dest"])
+    grid = None
+    try:
+        radii = job["radii"]
+        grid = PointGrid(src_points, choose_cell_size(src_points, radii[-1]))
+        for start, end in job["ranges"]:
+            part = solve_sphere_rows(grid, dest_points[start:end], radii, job["use_one_vertex"])
+            path = get_output_path(job["output_directory"], start, end)
+            # ParallelSolver.poll only picks up complete files
+            with open(path + ".tmp", "wb") as f:
+                np.savez(f, offsets=part.offsets, indices=part.indices, weights=part.weights)
+            os.replace(path + ".tmp", path)
+    finally:
+        # views of the shared buffers have to be released before closing them
+        grid = src_points = dest_points = None
+        src_block.close()
+        dest_block.close()
+
+
+if __name__ == "__main__":
+    run_solver_process(json.loads(sys.argv[1]))
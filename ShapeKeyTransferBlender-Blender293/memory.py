@@ -0,0 +1,153 @@
+#----------------------------------------------------------
+# File memory.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+import os
+import tempfile
+import numpy as np
+
+MEGABYTE = 1024 * 1024
+
+
+# Account of the array memory held by a transfer
+# ----------------------------------------------------------
+
+class MemoryBudget:
+    """
+    Counts the bytes of the arrays a transfer keeps against a budget.
+
+    Arrays which do not fit are not kept in memory, the caller reads them
+    again when needed or moves them to disk. peak is the most bytes held
+    at once and is reported after the transfer.
+    """
+    def __init__(self, budget):
+        self.budget = budget
+        self.used   = 0
+        self.peak   = 0
+
+    # bytes left in the budget
+    @property
+    def free(self):
+        return max(self.budget - self.used, 0)
+
+    # count nbytes as held and return True if they fit in the budget, otherwise nothing is counted and False is returned
+    def reserve(self, nbytes, force=False):
+        if(not force and self.used + nbytes > self.budget):
+            return False
+        self.used += nbytes
+        self.peak = max(self.peak, self.used)
+        return True
+
+    def release(self, nbytes):
+        self.used = max(self.used - nbytes, 0)
+
+    # count a temporary allocation of nbytes towards the peak only
+    def touch(self, nbytes):
+        self.peak = max(self.peak, self.used + nbytes)
+
+
+# Coordinate buffers allocated once and reused for every shape key
+# ----------------------------------------------------------
+
+class BufferPool:
+    """
+    Named (rows, columns) buffers, float32 (rows, 3) unless asked otherwise, every name is allocated once.
+
+    A key is read into a buffer, transferred and written back, then the
+    same buffer receives the next key, so streaming any number of keys
+    needs the memory of one key per buffer.
+    """
+    def __init__(self, budget):
+        self.budget  = budget
+        self.buffers = {}
+
+    # columns None gives a (rows,) buffer
+    def get(self, name, rows, columns=3, dtype=np.float32):
+        shape = (rows, columns) if columns else (rows,)
+        buffer = self.buffers.get(name)
+        if(buffer is None or buffer.shape != shape or buffer.dtype != dtype):
+            if(buffer is not None):
+                self.budget.release(buffer.nbytes)
+            buffer = np.empty(shape, dtype=dtype)
+            # buffers are always needed, they count even above the budget
+            self.budget.reserve(buffer.nbytes, force=True)
+            self.buffers[name] = buffer
+        return buffer
+
+    def clear(self):
+        for buffer in self.buffers.values():
+            self.budget.release(buffer.nbytes)
+        self.buffers = {}
+
+
+# Arrays kept in memory while they fit the budget and on disk otherwise
+# ----------------------------------------------------------
+
+class SpillStore:
+    """Stores arrays by name, in memory within the budget and as temporary .npy files above it"""
+    def __init__(self, budget):
+        self.budget    = budget
+        self.arrays    = {}
+        self.paths     = {}
+        self.directory = None
+        self.file_count = 0
+
+    def __contains__(self, name):
+        return name in self.arrays or name in self.paths
+
+    def __len__(self):
+        return len(self.arrays) + len(self.paths)
+
+    def put(self, name, array):
+        self.remove(name)
+        if(self.budget.reserve(array.nbytes)):
+            self.arrays[name] = array.copy()
+            return
+        if(self.directory is None):
+            self.directory = tempfile.mkdtemp(prefix="shapekeytransfer_")
+        path = os.path.join(self.directory, "%d.npy" % self.file_count)
+        self.file_count += 1
+        np.save(path, array)
+        self.paths[name] = path
+
+    def get(self, name):
+        if(name in self.arrays):
+            return self.arrays[name]
+        return np.load(self.paths[name])
+
+    def items(self):
+        for name in list(self.arrays) + list(self.paths):
+            yield name, self.get(name)
+
+    def remove(self, name):
+        if(name in self.arrays):
+            self.budget.release(self.arrays.pop(name).nbytes)
+        if(name in self.paths):
+            os.remove(self.paths.pop(name))
+
+    def clear(self):
+        for name in list(self.arrays) + list(self.paths):
+            self.remove(name)
+        if(self.directory is not None):
+            try:
+                os.rmdir(self.directory)
+            except OSError:
+                pass
+            self.directory = None
@@ -19,16 +19,157 @@
 #
 # ----------------------------------------------------------
 
+import os
+import time
 import bpy
 import bmesh
+from bpy.app.handlers import persistent
+import numpy as np
 from mathutils import Vector
+from mathutils.kdtree import KDTree
+from mathutils.bvhtree import BVHTree
 
 from bpy.types import (Operator, 
                        UIList, 
                        Panel)
 
+from . correspondence import Correspondence, ParallelSolver, barycentric_weights, neighbour_weights
+from . cache import CorrespondenceCache, CheckpointStore, fingerprint
+from . topology import edge_adjacency, HoleFiller, Laplacian
+from . memory import MEGABYTE, MemoryBudget, BufferPool, SpillStore
+from . workers import split_vertex_range, start_worker
+
 # __reload_order_index__ = 1
 
+
+# Bulk access to vertex coordinates
+# ----------------------------------------------------------
+
+# read the co of every element of a key block data or vertices collection into a (n, 3) float32 array
+# out is an optional contiguous (n, 3) float32 buffer to read into instead of a new array
+def read_coordinates(data, out=None):
+    co = np.empty(len(data) * 3, dtype=np.float32) if out is None else out.reshape(-1)
+    data.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+# read the vertex pairs of every edge of a mesh into a (m, 2) int32 array
+def read_edges(mesh):
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    return edges.reshape(-1, 2)
+
+# read the corners of every loop triangle of a mesh into a (t, 3) int32 array
+def read_triangles(mesh):
+    mesh.calc_loop_triangles()
+    triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    return triangles.reshape(-1, 3)
+
+# read the weights of one vertex group of an object into a (n,) float32 array, vertices outside the group get 0
+# vertex group weights have no bulk access so this loops over the vertices once
+def read_vertex_group(obj, name):
+    index = obj.vertex_groups[name].index
+    weights = np.zeros(len(obj.data.vertices), dtype=np.float32)
+    for vertex in obj.data.vertices:
+        for element in vertex.groups:
+            if(element.group == index):
+                weights[vertex.index] = element.weight
+    return weights
+
+# write a (n, 3) array back to the co of every element of a key block data or vertices collection
+def write_coordinates(data, co):
+    data.foreach_set("co", np.ascontiguousarray(co, dtype=np.float32).ravel())
+
+# transform (n, 3) local coordinates by a 4x4 matrix
+def transform_coordinates(matrix, co):
+    m = np.array(matrix, dtype=np.float32)
+    return co @ m[:3, :3].T + m[:3, 3]
+
+# run a generator of transfer steps to the end and return its result
+def run_steps(steps):
+    try:
+        while(True):
+            next(steps)
+    except StopIteration as e:
+        return e.value
+
+
+# Objects using every mesh
+# ----------------------------------------------------------
+
+class MeshUsers:
+    """
+    Reverse index from meshes to the objects using them.
+
+    It is built with one pass over bpy.data.objects when first needed and
+    dropped when objects are added, removed or given another mesh, so finding
+    the objects of a mesh does not scan every object of the file each time.
+    """
+    def __init__(self):
+        self.users = None
+        # mesh of every indexed object and the number of objects when the index was built
+        self.meshes = {}
+        self.object_count = 0
+
+    def invalidate(self):
+        self.users = None
+
+    def build(self):
+        self.users = {}
+        self.meshes = {}
+        for ob in bpy.data.objects:
+            if(ob.type == 'MESH'):
+                self.users.setdefault(ob.data.as_pointer(), []).append(ob)
+                self.meshes[ob.as_pointer()] = ob.data.as_pointer()
+        self.object_count = len(bpy.data.objects)
+
+    # True when objects were added or removed or an updated object uses another mesh than in the index
+    # transform, selection and mesh edits leave the index as it is
+    def is_outdated(self, updates):
+        if(self.users is None):
+            return False
+        if(len(bpy.data.objects) != self.object_count):
+            return True
+        for update in updates:
+            if(isinstance(update.id, bpy.types.Object)):
+                ob = update.id.original
+                mesh = ob.data.as_pointer() if ob.type == 'MESH' else None
+                if(self.meshes.get(ob.as_pointer()) != mesh):
+                    return True
+        return False
+
+    # every object using mesh sorted by name, so the first one does not depend on the file order or the selection
+    def get(self, mesh):
+        if(self.users is None):
+            self.build()
+        objects = self.users.get(mesh.as_pointer(), [])
+        try:
+            if(not all(ob.data == mesh for ob in objects)):
+                objects = None
+        except ReferenceError:
+            objects = None
+        if(objects is None):
+            # an object was removed or changed its mesh without a depsgraph update, for example by undo
+            self.build()
+            objects = self.users.get(mesh.as_pointer(), [])
+        # names can change without invalidating the index
+        return sorted(objects, key=lambda ob: ob.name)
+
+MESH_USERS = MeshUsers()
+
+# drop the index when objects were added, removed or changed their mesh
+@persistent
+def invalidate_mesh_users(scene=None, depsgraph=None):
+    if(depsgraph is None or MESH_USERS.is_outdated(depsgraph.updates)):
+        MESH_USERS.invalidate()
+
+# handlers which invalidate the index, registered with the addon
+MESH_USERS_HANDLERS = ("depsgraph_update_post", "undo_post", "redo_post", "load_post")
+
+# custom property of the destination shape keys (the Key datablock) holding the hash of every transferred key
+KEY_HASHES_PROPERTY = "shapekeytransfer_hashes"
+
+
 # Class which handles shape key transfers
 # ----------------------------------------------------------
 
@@ -41,12 +182,53 @@ class ShapeKeyTransfer:
         self.increment_radius = .05
         self.number_of_increments = 20
         # set total vertices incase you want to run for less number of vertices also set specify_end_vertex to True
-        # set current_vertex index incase you want to continue from another index
+        # set start_vertex_index incase you want to continue from another index
         # use_one_vertex will transfer the weight of the closest vertex within the selection sphere
+        self.start_vertex_index   = 0
         self.current_vertex_index = 0
         self.total_vertices       = 0
-        self.specify_end_vertex   = False # not yet implemented
+        self.specify_end_vertex   = False
         self.use_one_vertex       = True
+        # SPHERE grows a selection sphere around every vertex, SURFACE projects vertices onto the closest source triangle
+        # NEAREST blends the neighbour_count closest source vertices weighted by INVERSE_DISTANCE or GAUSSIAN falloff
+        self.transfer_mode        = 'SPHERE'
+        self.neighbour_count      = 4
+        self.neighbour_weighting  = 'INVERSE_DISTANCE'
+        self.gaussian_radius      = 0.01
+        # store computed correspondences on disk and reuse them for the same meshes and settings
+        self.use_cache            = True
+        self.cache_directory      = ""
+        self.cache_max_entries    = 32
+        # store every finished chunk of destination vertices so an interrupted transfer resumes from there
+        self.use_checkpoints      = True
+        self.checkpoint_directory = ""
+        self.chunk_size           = 10000
+        # match with the numpy solver in this many separate processes when greater than 1 (sphere search only)
+        self.solver_processes     = 1
+        # copy keys by vertex index when both meshes have the same vertices (within the tolerance) or when forced
+        self.topology_tolerance   = 0.0001
+        self.force_index_copy     = False
+        # source vertices moving less than this on every axis count as static, keys without moving vertices are empty
+        self.delta_threshold      = 0.000001
+        self.skip_empty_keys      = False
+        # only transfer keys whose hash differs from the one stored on the destination and remove the ones deleted from the source
+        self.only_changed_keys    = False
+        # give unpaired destination vertices the deltas of their paired neighbours over the mesh edges
+        self.fill_unpaired_vertices = False
+        self.fill_iterations      = 10
+        # smooth the deltas of all transferred keys over the destination mesh with a UNIFORM or COTANGENT laplacian
+        self.use_smoothing        = False
+        self.smoothing_type       = 'UNIFORM'
+        self.smoothing_strength   = 0.5
+        self.smoothing_iterations = 5
+        self.smoothing_vertex_group = ""
+        # only match source vertices of src_vertex_group and only transfer to destination vertices of dest_vertex_group
+        # inside the bounding box of bounds_object, the other destination vertices of the range get the basis
+        self.src_vertex_group     = ""
+        self.dest_vertex_group    = ""
+        self.bounds_object        = None
+        # megabytes of kept arrays (source deltas, original keys for rollback) above which keys are read again or moved to disk
+        self.memory_budget        = 1024
 
         # shape keys to ignore
         self.default_excluded_keys = self.excluded_shape_keys = ['Basis', 'Expressions_IDHumans_max'] 
@@ -55,41 +237,186 @@ class ShapeKeyTransfer:
         self.dest_mesh            = None
         self.src_mesh             = None
         self.src_mwi              = None
-        self.dest_shape_key_index = 0
-        self.src_shape_key_index  = 0
-        self.do_once_per_vertex   = False        
-        self.current_vertex       = None
-        self.src_chosen_vertices  = []
+        self.src_kd               = None
+        self.src_bvh              = None
+        self.src_triangles        = None
+        self.src_mask             = None
+        self.dest_mask            = None
+        self.basis_vertices       = None
+        self.source_index_built   = False
+        # (moving source vertices, their deltas) of every key, read once and reused for every destination of a batch transfer
+        self.keep_source_deltas   = False
+        self.src_key_deltas       = {}
+        # hash of the source deltas of every key
+        self.src_key_hashes       = {}
+        self.empty_key_names      = []
+        # (object name, matched vertices, unpaired vertices, error message or None) of every batch destination
+        self.batch_summary        = []
+        self.batch_index          = 0
+        self.batch_count          = 0
+        self.src_basis_co         = None
+        self.dest_world_basis     = None
+        # vertex adjacency (offsets, neighbours) of the destination mesh, built when it is first needed
+        self.dest_adjacency       = None
+        self.dest_laplacian       = None
+        self.hole_filler          = None
+        # matched source vertices and their weights for every destination vertex
+        self.correspondence       = None
+        self.correspondence_cached = False
+        self.index_copy           = False
+        # progress of a running transfer, SEARCH while matching vertices then APPLY while writing keys
+        self.stage                = None
+        self.src_key_names        = []
+        self.key_names            = []
+        self.current_key_index    = 0
+        # hash of every key transferred to the current destination, unchanged keys and transferred keys deleted from the source
+        self.key_hashes           = {}
+        self.unchanged_key_names  = []
+        self.deleted_key_names    = []
+        # what a transfer changed on the destination mesh, used to roll it back
+        # the original keys are only kept when a modal operator can interrupt the transfer
+        self.keep_rollback        = False
+        self.added_key_names      = []
+        self.memory               = MemoryBudget(self.memory_budget * MEGABYTE)
+        self.buffers              = BufferPool(self.memory)
+        self.original_key_co      = SpillStore(self.memory)
+        self.failed               = False
         self.message              = ""
         self.skip_vertices_with_no_pair = False
 
+    # copy the transfer settings from the scene properties
+    def load_settings(self, skt):
+        self.transfer_mode    = skt.transfer_mode
+        self.neighbour_count  = skt.neighbour_count
+        self.neighbour_weighting = skt.neighbour_weighting
+        self.gaussian_radius  = skt.gaussian_radius
+        self.increment_radius = skt.increment_radius
+        self.use_one_vertex   = skt.use_one_vertex
+        self.fill_unpaired_vertices = skt.fill_unpaired_vertices
+        self.fill_iterations  = skt.fill_iterations
+        self.use_smoothing    = skt.use_smoothing
+        self.smoothing_type   = skt.smoothing_type
+        self.smoothing_strength = skt.smoothing_strength
+        self.smoothing_iterations = skt.smoothing_iterations
+        self.smoothing_vertex_group = skt.smoothing_vertex_group
+        self.src_vertex_group = skt.src_vertex_group
+        self.dest_vertex_group = skt.dest_vertex_group
+        self.bounds_object    = skt.bounds_object
+        self.memory_budget    = skt.memory_budget
+        # unpaired vertices have to be skipped while matching to be filled afterwards
+        self.skip_vertices_with_no_pair = skt.skip_unpaired_vertices or skt.fill_unpaired_vertices
+        self.number_of_increments = skt.number_of_increments
+        self.use_cache         = skt.use_cache
+        self.cache_directory   = bpy.path.abspath(skt.cache_directory)
+        self.cache_max_entries = skt.cache_max_entries
+        self.start_vertex_index = skt.start_vertex
+        self.specify_end_vertex = skt.specify_end_vertex
+        self.total_vertices     = skt.end_vertex
+        self.use_checkpoints    = skt.use_checkpoints
+        self.checkpoint_directory = bpy.path.abspath(skt.checkpoint_directory)
+        self.chunk_size         = skt.chunk_size
+        self.solver_processes   = skt.solver_processes
+        self.topology_tolerance = skt.topology_tolerance
+        self.force_index_copy   = skt.force_index_copy
+        self.delta_threshold    = skt.delta_threshold
+        self.skip_empty_keys    = skt.skip_empty_keys
+        self.only_changed_keys  = skt.only_changed_keys
+
+    # first and end destination vertex of the transfer for a mesh with count vertices
+    def get_vertex_range(self, count):
+        end = min(self.total_vertices, count) if self.specify_end_vertex else count
+        return min(self.start_vertex_index, end), end
+
+    # read the destination basis in world space
+    def read_destination_basis(self):
+        if(self.dest_mesh.data.shape_keys):
+            dest_basis = self.dest_mesh.data.shape_keys.key_blocks[0].data
+        else:
+            dest_basis = self.dest_mesh.data.vertices
+        self.dest_world_basis = transform_coordinates(self.dest_mesh.matrix_world, read_coordinates(dest_basis))
+
+    # hash of everything the correspondence depends on, used as the cache key
+    # checkpoints of separate vertex ranges are merged so their key leaves out the range
+    def get_fingerprint(self, include_range=True):
+        settings = {
+            "increment_radius": self.increment_radius,
+            "number_of_increments": self.number_of_increments,
+            "use_one_vertex": self.use_one_vertex,
+            "transfer_mode": self.transfer_mode,
+            "neighbour_count": self.neighbour_count,
+            "neighbour_weighting": self.neighbour_weighting,
+            "gaussian_radius": self.gaussian_radius,
+            "skip_vertices_with_no_pair": self.skip_vertices_with_no_pair,
+            }
+        if(include_range):
+            settings["start_vertex_index"] = self.start_vertex_index
+            settings["total_vertices"] = self.total_vertices
+        masks = tuple(mask for mask in (self.src_mask, self.dest_mask) if mask is not None)
+        settings["masks"] = (self.src_mask is not None, self.dest_mask is not None)
+        # the surface projection also depends on the source faces, which can change while the vertices stay put
+        triangles = (self.get_source_triangles(),) if self.transfer_mode == 'SURFACE' else ()
+        return fingerprint((self.src_basis_co, np.array(self.src_mwi), self.dest_world_basis) + masks + triangles, settings)
+
+    # loop triangles of the source mesh completely inside the source mask, read once per source
+    def get_source_triangles(self):
+        if(self.src_triangles is None):
+            self.src_triangles = read_triangles(self.src_mesh.data)
+            if(self.src_mask is not None):
+                self.src_triangles = self.src_triangles[self.src_mask[self.src_triangles].all(axis=1)]
+        return self.src_triangles
+
+    # build a kd-tree over the source basis (or a bvh tree over its triangles) once per transfer so queries do not scan every vertex
+    def build_source_index(self):
+        if(self.source_index_built):
+            return
+        self.source_index_built = True
+        if(self.transfer_mode == 'SURFACE'):
+            self.src_bvh = BVHTree.FromPolygons(self.src_basis_co.tolist(), self.get_source_triangles().tolist(), all_triangles=True)
+            return
+        src_vertices = self.get_source_vertices()
+        self.src_kd = KDTree(len(src_vertices))
+        for index in src_vertices:
+            self.src_kd.insert(self.src_basis_co[index], int(index))
+        self.src_kd.balance()
+
+    # indices of the source vertices which can be matched
+    def get_source_vertices(self):
+        if(self.src_mask is None):
+            return np.arange(len(self.src_basis_co))
+        return np.flatnonzero(self.src_mask)
+
+    # rows of destination vertices start to end inside the destination mask
+    def get_active_rows(self, start, end):
+        if(self.dest_mask is None):
+            return range(end - start)
+        return np.flatnonzero(self.dest_mask[start:end]).tolist()
+
+    # boolean array of the destination vertices matched and written by the transfer, the vertex range inside the destination mask
+    def get_processed_vertices(self):
+        processed = np.zeros(len(self.dest_world_basis), dtype=bool)
+        processed[self.start_vertex_index:self.total_vertices] = True
+        if(self.dest_mask is not None):
+            processed &= self.dest_mask
+        return processed
+
     # select required vertices within a radius and return array of indices
     def select_vertices(self, center, radius):            
-        src_chosen_vertices = []
-        closest_vertex_index = -1
         radius_vec = center + Vector((0, 0, radius))        
         # put selection sphere in local coords.
         lco = self.src_mwi @ center
         r   = self.src_mwi @ (radius_vec) - lco
-        closest_length = r.length        
+
+        if(self.use_one_vertex):
+            co, closest_vertex_index, closest_length = self.src_kd.find(lco)
+            if(closest_vertex_index is None or closest_length > r.length):
+                return []
+            # on ties keep the highest index like the previous linear scan did
+            for co, index, dist in self.src_kd.find_range(lco, closest_length):
+                closest_vertex_index = max(closest_vertex_index, index)
+            return [closest_vertex_index]
 
         # select verts within radius
-        for index, v in enumerate(self.src_mesh.data.shape_keys.key_blocks[0].data):
-            is_selected = (v.co - lco).length <= r.length     
-            if(is_selected):
-                src_chosen_vertices.append(index)
-                if(self.use_one_vertex):
-                    if((v.co - lco).length <= closest_length):
-                        closest_length = (v.co - lco).length
-                        closest_vertex_index = index            
-
-        # update closest vertex
-        if(self.use_one_vertex):                
-            src_chosen_vertices = []
-            if(closest_vertex_index > - 1):
-                src_chosen_vertices.append(closest_vertex_index)            
-
-        return src_chosen_vertices
+        return sorted(index for co, index, dist in self.src_kd.find_range(lco, r.length))
 
     # this select function initially starts (if level=0) by matching a point in same space as the source mesh and if it cant find similar positioned point we increment search radius   
     def select_required_verts(self, vert, rad, level=0):    
@@ -102,114 +429,659 @@ class ShapeKeyTransfer:
         else:        
             return verts
 
-    # set the new vertex position on the shape key
-    def set_vertex_position(self, v_pos):    
-        self.dest_mesh.data.shape_keys.key_blocks[self.dest_shape_key_index].data[self.current_vertex_index].co = v_pos
-
-    # update 1 vertex of destination mesh
-    def update_vertex(self):
-        if(self.current_vertex_index >= self.total_vertices ):
-            return False
-
-        if(self.do_once_per_vertex):
-            #mathutils now uses the PEP 465 binary operator for multiplying matrices change * to @
-            self.current_vertex = self.dest_mesh.matrix_world @ self.dest_mesh.data.shape_keys.key_blocks[0].data[self.current_vertex_index].co       
-            self.src_chosen_vertices = self.select_required_verts(self.current_vertex,0)   
-            self.do_once_per_vertex = False
+    # chunks of the destination vertex range, aligned to multiples of chunk_size so separate runs produce the same chunks
+    def get_vertex_chunks(self):
+        chunks = []
+        start = self.start_vertex_index
+        while(start < self.total_vertices):
+            end = min((start // self.chunk_size + 1) * self.chunk_size, self.total_vertices)
+            chunks.append((start, end))
+            start = end
+        return chunks
+
+    # match every destination vertex to source vertices once, the result only depends on the basis of both meshes
+    # this is a generator yielding once per vertex, it returns True on failure
+    def compute_correspondence(self):
+        checkpoints = CheckpointStore(self.checkpoint_directory) if self.use_checkpoints else None
+        checkpoint_key = self.get_fingerprint(include_range=False)
+        parts = []
+        missing_chunks = []
+        for start, end in self.get_vertex_chunks():
+            part = checkpoints.load(checkpoint_key, start, end) if checkpoints else None
+            if(part is None):
+                missing_chunks.append((start, end))
+            else:
+                parts.append((start, part))
+
+        # store every chunk as soon as it is finished
+        def finish_chunk(start, end, part):
+            parts.append((start, part))
+            if(checkpoints):
+                try:
+                    checkpoints.save(checkpoint_key, start, end, part)
+                except OSError as e:
+                    print("Could not store a checkpoint: " + str(e))
+
+        if(missing_chunks):
+            if(self.solver_processes > 1 and self.transfer_mode == 'SPHERE'):
+                failed = yield from self.compute_chunks_parallel(missing_chunks, finish_chunk)
+            else:
+                failed = yield from self.compute_chunks(missing_chunks, finish_chunk)
+            if(failed):
+                return True
+        self.current_vertex_index = self.total_vertices
+        self.correspondence = Correspondence.merge(len(self.dest_world_basis), parts)
+        return False
 
-        if(len(self.src_chosen_vertices) == 0):
-            self.message = ("Failed to find surrounding vertices | Try increasing increment radius | vertex index " + str(self.current_vertex_index) + " at shape key index " + str(self.src_shape_key_index))
-            self.current_vertex_index += 1
-            if(not self.skip_vertices_with_no_pair):
+    # remove the chunks of a complete transfer, called once its mapping is merged and cached
+    # workers keep their chunks, the transfer merging them needs them
+    def clear_checkpoints(self):
+        if(self.use_checkpoints and self.start_vertex_index == 0 and self.total_vertices == len(self.dest_world_basis)):
+            CheckpointStore(self.checkpoint_directory).clear(self.get_fingerprint(include_range=False))
+
+    # match the chunks one after another inside Blender, generator returning True on failure
+    def compute_chunks(self, chunks, finish_chunk):
+        self.build_source_index()
+        for start, end in chunks:
+            if(self.transfer_mode == 'SURFACE'):
+                part = yield from self.compute_surface_rows(start, end)
+            elif(self.transfer_mode == 'NEAREST'):
+                part = yield from self.compute_nearest_rows(start, end)
+            else:
+                part = yield from self.compute_sphere_rows(start, end)
+            if(part is None):
                 return True
+            finish_chunk(start, end, part)
+        return False
+
+    # radii of the growing selection sphere in source local space, the first one is 0
+    def get_search_radii(self):
+        radii = []
+        radius = 0
+        for level in range(self.number_of_increments + 1):
+            radii.append((self.src_mwi.to_3x3() @ Vector((0, 0, radius))).length)
+            radius += self.increment_radius
+        return radii
+
+    # match the chunks with the numpy solver in separate processes, generator returning True on failure
+    def compute_chunks_parallel(self, chunks, finish_chunk):
+        # the solver only sees the source vertices inside the source mask, its indices are mapped back below
+        src_vertices = self.get_source_vertices()
+        # and only the destination vertices inside the destination mask, its rows are scattered back below
+        dest_rows = np.arange(len(self.dest_world_basis)) if self.dest_mask is None else np.flatnonzero(self.dest_mask)
+        solver = ParallelSolver(self.src_basis_co[src_vertices], transform_coordinates(self.src_mwi, self.dest_world_basis[dest_rows]),
+                                self.get_search_radii(), self.use_one_vertex, self.solver_processes)
+        # chunk of the mesh of every range of solver rows, chunks without a vertex inside the mask are finished right away
+        solver_chunks = {}
+        for start, end in chunks:
+            solver_start, solver_end = (int(row) for row in np.searchsorted(dest_rows, (start, end)))
+            if(solver_start < solver_end):
+                solver_chunks[(solver_start, solver_end)] = (start, end)
             else:
-                return False
-
-        result_position = Vector()    
-        for v in self.src_chosen_vertices:
-            result_position +=  self.src_mesh.data.shape_keys.key_blocks[0].data[v].co    
-        result_position /= len(self.src_chosen_vertices)
-
-        result_position2 = Vector()
-        for v in self.src_chosen_vertices:
-            result_position2 += self.src_mesh.data.shape_keys.key_blocks[self.src_shape_key_index].data[v].co        
-        result_position2 /= len(self.src_chosen_vertices)    
-        result = result_position2 - result_position + self.current_vertex        
-        self.set_vertex_position(result)
+                finish_chunk(start, end, Correspondence(np.zeros(end - start + 1, dtype=np.int64), [], []))
+        try:
+            solver.start(list(solver_chunks))
+            self.current_vertex_index = self.total_vertices - sum(end - start for start, end in solver_chunks.values())
+            while(solver.pending):
+                for solver_start, solver_end, part in solver.poll():
+                    start, end = solver_chunks[(solver_start, solver_end)]
+                    part = Correspondence(part.offsets, src_vertices[part.indices], part.weights)
+                    part = part.scatter_rows(dest_rows[solver_start:solver_end] - start, end - start)
+                    unpaired = np.flatnonzero(~part.matched & self.get_processed_vertices()[start:end])
+                    if(len(unpaired) and not self.skip_vertices_with_no_pair):
+                        self.message = ("Failed to find surrounding vertices | Try increasing increment radius | vertex index " + str(start + unpaired[0]))
+                        return True
+                    finish_chunk(start, end, part)
+                    self.current_vertex_index += end - start
+                time.sleep(0.01)
+                yield
+        except RuntimeError as e:
+            self.message = str(e)
+            return True
+        finally:
+            solver.close()
         return False
 
-    # store shapekey index 
-    def update_global_shapekey_indices(self, p_key_name): 
-        for index, sk in enumerate(self.dest_mesh.data.shape_keys.key_blocks):
-            if sk.name == p_key_name:            
-                self.dest_shape_key_index = index
-        for index, sk in enumerate(self.src_mesh.data.shape_keys.key_blocks):
-            if sk.name == p_key_name:            
-                self.src_shape_key_index = index
+    # match destination vertices start to end with the growing selection sphere
+    # generator returning the Correspondence of these rows or None on failure
+    def compute_sphere_rows(self, start, end):
+        chosen_vertices = [[] for row in range(end - start)]
+        vertex_weights  = [[] for row in range(end - start)]
+        for row in self.get_active_rows(start, end):
+            self.current_vertex_index = start + row
+            current_vertex = Vector(self.dest_world_basis[self.current_vertex_index])
+            chosen = self.select_required_verts(current_vertex, 0)
+            if(len(chosen) == 0):
+                self.message = ("Failed to find surrounding vertices | Try increasing increment radius | vertex index " + str(self.current_vertex_index))
+                if(not self.skip_vertices_with_no_pair):
+                    return None
+            chosen_vertices[row] = chosen
+            vertex_weights[row] = [1.0 / len(chosen)] * len(chosen) if chosen else []
+            yield
+        self.current_vertex_index = end
+        return Correspondence.from_lists(chosen_vertices, vertex_weights)
+
+    # project destination vertices start to end onto the closest source triangle and weight its corners barycentrically
+    # generator returning the Correspondence of these rows or None on failure
+    def compute_surface_rows(self, start, end):
+        if(len(self.src_triangles) == 0):
+            self.message = "Surface projection needs a source mesh with faces!"
+            return None
+        # the largest selection sphere of the sphere search limits the projection distance
+        max_distance = (self.src_mwi.to_3x3() @ Vector((0, 0, self.increment_radius * self.number_of_increments))).length
+        local_co = transform_coordinates(self.src_mwi, self.dest_world_basis[start:end])
+        count = end - start
+        locations = np.zeros((count, 3), dtype=np.float32)
+        triangle_indices = np.zeros(count, dtype=np.int32)
+        matched = np.zeros(count, dtype=bool)
+        for row in self.get_active_rows(start, end):
+            self.current_vertex_index = start + row
+            location, normal, index, distance = self.src_bvh.find_nearest(local_co[row], max_distance)
+            if(index is None):
+                self.message = ("Failed to find a source surface | Try increasing increment radius | vertex index " + str(self.current_vertex_index))
+                if(not self.skip_vertices_with_no_pair):
+                    return None
+            else:
+                locations[row] = location
+                triangle_indices[row] = index
+                matched[row] = True
+            yield
+        self.current_vertex_index = end
+        corners = self.src_triangles[triangle_indices]
+        weights = barycentric_weights(locations, *(self.src_basis_co[corners[:, i]] for i in range(3)))
+        return Correspondence.from_fixed_width(corners, weights, matched)
+
+    # find the neighbour_count closest source vertices of destination vertices start to end and weight them by distance
+    # generator returning the Correspondence of these rows or None on failure
+    def compute_nearest_rows(self, start, end):
+        # the largest selection sphere of the sphere search limits the neighbour distance
+        max_distance = (self.src_mwi.to_3x3() @ Vector((0, 0, self.increment_radius * self.number_of_increments))).length
+        local_co = transform_coordinates(self.src_mwi, self.dest_world_basis[start:end])
+        count = end - start
+        k = min(self.neighbour_count, len(self.get_source_vertices()))
+        indices = np.zeros((count, k), dtype=np.int32)
+        distances = np.zeros((count, k), dtype=np.float32)
+        valid = np.zeros((count, k), dtype=bool)
+        for row in self.get_active_rows(start, end):
+            self.current_vertex_index = start + row
+            found = [(index, dist) for co, index, dist in self.src_kd.find_n(local_co[row], k) if dist <= max_distance]
+            if(len(found) == 0):
+                self.message = ("Failed to find surrounding vertices | Try increasing increment radius | vertex index " + str(self.current_vertex_index))
+                if(not self.skip_vertices_with_no_pair):
+                    return None
+            else:
+                indices[row, :len(found)], distances[row, :len(found)] = zip(*found)
+                valid[row, :len(found)] = True
+            yield
+        self.current_vertex_index = end
+        radius = (self.src_mwi.to_3x3() @ Vector((0, 0, self.gaussian_radius))).length
+        weights = neighbour_weights(distances, valid, self.neighbour_weighting, radius)
+        # rows keep their full width, missing neighbours get weight 0
+        return Correspondence.from_fixed_width(indices, weights, valid.any(axis=1))
+
+    # names of the source shape keys to transfer, in source order
+    def get_transfer_key_names(self, use_only_excluded_shape_keys):
+        key_names = []
+        for src_shape_key_iter in self.src_mesh.data.shape_keys.key_blocks:
+            if((src_shape_key_iter.name in self.excluded_shape_keys) == use_only_excluded_shape_keys):
+                key_names.append(src_shape_key_iter.name)
+        return key_names
 
+    # True when the destination has the same vertex count as the source and, unless forced, the same world space basis
+    def is_topology_identical(self):
+        if(len(self.src_basis_co) != len(self.dest_world_basis)):
+            return False
+        if(self.force_index_copy):
+            return True
+        src_world_basis = transform_coordinates(self.src_mesh.matrix_world, self.src_basis_co)
+        return bool(np.all(np.abs(src_world_basis - self.dest_world_basis) <= self.topology_tolerance))
+
+    # source key minus source basis of every transferred key, only the moving vertices and their deltas are kept
+    # deltas which do not fit the memory budget are not kept, apply_shape_key reads them again
+    def read_source_deltas(self):
+        src_key_blocks = self.src_mesh.data.shape_keys.key_blocks
+        self.empty_key_names = []
+        for key_name in self.key_names:
+            if(not key_name in self.src_key_deltas):
+                src_delta = read_coordinates(src_key_blocks[key_name].data, self.buffers.get("src", len(self.src_basis_co)))
+                src_delta -= self.src_basis_co
+                moving = np.flatnonzero(np.abs(src_delta).max(axis=1) > self.delta_threshold) if len(src_delta) else np.zeros(0, dtype=np.int64)
+                self.memory.reserve(moving.nbytes, force=True)
+                moving_delta = src_delta[moving] if self.memory.reserve(len(moving) * 12) else None
+                self.src_key_deltas[key_name] = (moving, moving_delta)
+                self.src_key_hashes[key_name] = fingerprint((moving, src_delta[moving]), {})
+            # the reference key never moves, it is not an empty shape key
+            if(len(self.src_key_deltas[key_name][0]) == 0 and key_name != src_key_blocks[0].name):
+                self.empty_key_names.append(key_name)
+
+    # forget the stored source deltas and give their memory back
+    def clear_source_deltas(self):
+        for moving, moving_delta in self.src_key_deltas.values():
+            self.memory.release(moving.nbytes + (moving_delta.nbytes if moving_delta is not None else 0))
+        self.src_key_deltas = {}
+        self.src_key_hashes = {}
+
+    # write one shape key of the destination mesh from the stored correspondence with one bulk read and write
+    # keys stream through the buffers of the pool, the gathers of the moving vertices are temporaries counted towards the peak
+    def apply_shape_key(self, key_name, dest_key):
+        moving, moving_delta = self.src_key_deltas[key_name]
+        if(moving_delta is None):
+            src_co = read_coordinates(self.src_mesh.data.shape_keys.key_blocks[key_name].data, self.buffers.get("src", len(self.src_basis_co)))
+            # the two gathers and their difference
+            self.memory.touch(3 * 12 * len(moving))
+            moving_delta = src_co[moving] - self.src_basis_co[moving]
+        dest_co   = read_coordinates(dest_key.data, self.buffers.get("dest", len(self.dest_world_basis)))
+        if(self.keep_rollback and not dest_key.name in self.added_key_names):
+            self.original_key_co.put(dest_key.name, dest_co)
+        matched   = self.correspondence.matched
+        # every matched vertex starts from the basis, only vertices matched to moving source vertices get a delta
+        # vertices of the range outside the masks are not matched and only get the basis
+        dest_co[self.basis_vertices] = self.dest_world_basis[self.basis_vertices]
+        if(len(moving) == 0):
+            pass
+        elif(self.index_copy):
+            # vertex i takes the delta of source vertex i, no gather needed
+            moving_matched = matched[moving]
+            dest_co[moving[moving_matched]] += moving_delta[moving_matched]
+        else:
+            src_moving = self.buffers.get("src_moving", len(self.src_basis_co), None, bool)
+            src_moving.fill(False)
+            src_moving[moving] = True
+            src_delta = self.buffers.get("src", len(self.src_basis_co))
+            src_delta.fill(0.0)
+            src_delta[moving] = moving_delta
+            correspondence = self.correspondence
+            # touches gathers the mask for every entry of the mapping and counts them per row
+            self.memory.touch(4 * len(correspondence.indices) + 5 * correspondence.count)
+            rows = np.flatnonzero(correspondence.touches(src_moving))
+            # blend_rows gathers a position, an index, a weight and a delta for every entry of the rows
+            entries = int((correspondence.offsets[rows + 1] - correspondence.offsets[rows]).sum())
+            self.memory.touch(28 * entries + 20 * len(rows))
+            blended = correspondence.blend_rows(src_delta, rows, self.buffers.get("blend", len(self.dest_world_basis))[:len(rows)])
+            dest_co[rows] += blended
+        if(self.hole_filler):
+            # unpaired vertices take the deltas spread from their paired neighbours
+            targets = self.hole_filler.targets
+            dest_co[targets] = self.dest_world_basis[targets]
+            if(len(moving)):
+                delta = np.subtract(dest_co, self.dest_world_basis, out=self.buffers.get("delta", len(self.dest_world_basis)))
+                # the neighbour gathers of the filled vertices and the deltas of the targets
+                self.memory.touch(12 * (len(self.hole_filler.filled_neighbours) + 2 * len(targets)))
+                dest_co[targets] += self.hole_filler.fill(delta)
+        write_coordinates(dest_key.data, dest_co)
+
+    # every object using the mesh, shape keys belong to the mesh so a transfer changes all of them at once
+    def get_users(self, mesh):
+        return MESH_USERS.get(mesh) if mesh else []
+
+    # the object used for the transform of a mesh, the first user by name so the result does not depend on the selection
+    # get_shared_mesh_note names it when the users of the mesh have other transforms
     def get_parent(self, mesh):
-        for ob in bpy.data.objects:
-            if (ob.data) == mesh:
-                return ob
-        return None
-
-    def transfer_shape_keys(self, src, dest, use_only_excluded_shape_keys = False):
-        self.src_mesh   = self.get_parent(src)
-        self.dest_mesh  = self.get_parent(dest)
-        self.src_mwi    = self.src_mesh.matrix_world.inverted()
-        
-        self.current_vertex_index = 0
-
-        local_shape_key_list = [] # used only when considering excluded shape keys
-
-        if(not(self.src_mesh and self.dest_mesh)):
+        users = self.get_users(mesh)
+        return users[0] if users else None
+
+    # note on the keys left out or removed by a transfer of only changed keys
+    def get_changed_keys_note(self):
+        if(not self.only_changed_keys):
+            return ""
+        note = " | %d unchanged shape keys kept" % len(self.unchanged_key_names)
+        if(self.deleted_key_names):
+            note += ", removed %s deleted from the source" % ", ".join(self.deleted_key_names)
+        return note
+
+    # note on meshes shared by several objects, which all get the shape keys
+    def get_shared_mesh_note(self, obj):
+        users = self.get_users(obj.data)
+        if(len(users) < 2):
+            return ""
+        note = " | mesh shared by %d objects (%s), all of them get the shape keys" % (len(users), ", ".join(ob.name for ob in users))
+        if(any(ob.matrix_world != obj.matrix_world for ob in users)):
+            note += ", matched with the transform of " + obj.name
+        return note
+
+    # check the source object and read its basis, the source index is built when it is first needed
+    # returns True on failure
+    def prepare_source(self, src_object, use_only_excluded_shape_keys = False):
+        self.failed     = True
+        self.stage      = None
+        self.src_mesh   = src_object
+        self.source_index_built = False
+        self.src_triangles = None
+        self.src_key_deltas = {}
+        self.src_key_hashes = {}
+        # every transfer starts with an empty account of its memory
+        self.original_key_co.clear()
+        self.memory     = MemoryBudget(self.memory_budget * MEGABYTE)
+        self.buffers    = BufferPool(self.memory)
+        self.original_key_co = SpillStore(self.memory)
+        if(not self.src_mesh):
             self.message = "The meshes are not valid!"
             return True
-        if(self.specify_end_vertex == False):
-            self.total_vertices = len(self.dest_mesh.data.vertices)            
         if(not hasattr(self.src_mesh.data.shape_keys, "key_blocks")):
             self.message = "There are no Shape Keys in the source mesh!"
             return True
+        self.src_mwi    = self.src_mesh.matrix_world.inverted()
+        self.src_key_names = self.get_transfer_key_names(use_only_excluded_shape_keys)
+        self.src_basis_co = read_coordinates(self.src_mesh.data.shape_keys.key_blocks[0].data)
+        self.src_mask = None
+        if(self.src_vertex_group):
+            if(not self.src_vertex_group in self.src_mesh.vertex_groups):
+                self.message = "There is no vertex group " + self.src_vertex_group + " in " + self.src_mesh.name + "!"
+                return True
+            self.src_mask = read_vertex_group(self.src_mesh, self.src_vertex_group) > 0
+        return False
+
+    # check the destination object and read its basis, returns True on failure
+    def prepare_destination(self, dest_object):
+        self.failed     = True
+        self.stage      = None
+        self.added_key_names = []
+        self.original_key_co.clear()
+        self.dest_mesh  = dest_object
+        self.dest_adjacency = None
+        self.dest_laplacian = None
+        self.hole_filler = None
+        self.current_key_index = 0
+        if(not self.dest_mesh):
+            self.message = "The meshes are not valid!"
+            return True
+        for vertex_group in (self.smoothing_vertex_group if self.use_smoothing else "", self.dest_vertex_group):
+            if(vertex_group and not vertex_group in self.dest_mesh.vertex_groups):
+                self.message = "There is no vertex group " + vertex_group + " in " + self.dest_mesh.name + "!"
+                return True
+        self.start_vertex_index, self.total_vertices = self.get_vertex_range(len(self.dest_mesh.data.vertices))
+        self.current_vertex_index = self.start_vertex_index
+        self.read_destination_basis()
+        self.read_destination_mask()
+        return False
+
+    # destination vertices inside the destination vertex group and the bounds object, None when both are unset
+    def read_destination_mask(self):
+        self.dest_mask = None
+        if(self.dest_vertex_group):
+            self.dest_mask = read_vertex_group(self.dest_mesh, self.dest_vertex_group) > 0
+        if(self.bounds_object):
+            # inside the bounding box of the bounds object, tested in its local space so rotated boxes work
+            local_co = transform_coordinates(self.bounds_object.matrix_world.inverted(), self.dest_world_basis)
+            corners = np.array([tuple(corner) for corner in self.bounds_object.bound_box], dtype=np.float32)
+            inside = ((local_co >= corners.min(axis=0)) & (local_co <= corners.max(axis=0))).all(axis=1)
+            self.dest_mask = inside if self.dest_mask is None else self.dest_mask & inside
+
+    # vertex adjacency of the destination mesh, read once per destination
+    def get_destination_adjacency(self):
+        if(self.dest_adjacency is None):
+            self.dest_adjacency = edge_adjacency(read_edges(self.dest_mesh.data), len(self.dest_world_basis))
+        return self.dest_adjacency
+
+    # smoothing operator of the destination mesh, built once per destination
+    def get_destination_laplacian(self):
+        if(self.dest_laplacian is None):
+            if(self.smoothing_type == 'COTANGENT'):
+                self.dest_laplacian = Laplacian.cotangent(self.dest_world_basis, read_triangles(self.dest_mesh.data), len(self.dest_world_basis))
+            else:
+                self.dest_laplacian = Laplacian.uniform(*self.get_destination_adjacency())
+        return self.dest_laplacian
+
+    # smooth the deltas of all transferred keys together, limited to the vertex range and the smoothing vertex group
+    def smooth_shape_keys(self):
+        mask = self.get_processed_vertices().astype(np.float32)
+        if(self.smoothing_vertex_group):
+            mask *= read_vertex_group(self.dest_mesh, self.smoothing_vertex_group)
+        dest_key_blocks = self.dest_mesh.data.shape_keys.key_blocks
+        laplacian = self.get_destination_laplacian()
+        # as many keys per multiply as the memory budget allows, counting the deltas, their gathered neighbours and the result
+        key_bytes = 12 * (3 * len(self.dest_world_basis) + len(laplacian.columns))
+        group_size = max(1, self.memory.free // key_bytes)
+        for first in range(0, len(self.key_names), group_size):
+            key_names = self.key_names[first:first + group_size]
+            self.memory.touch(len(key_names) * key_bytes)
+            # (vertices, keys, 3) so one multiply smooths every key of the group
+            deltas = np.stack([read_coordinates(dest_key_blocks[key_name].data) for key_name in key_names], axis=1)
+            deltas -= self.dest_world_basis[:, np.newaxis]
+            deltas = laplacian.smooth(deltas, self.smoothing_strength, self.smoothing_iterations, mask)
+            for index, key_name in enumerate(key_names):
+                write_coordinates(dest_key_blocks[key_name].data, self.dest_world_basis + deltas[:, index])
+
+    # prepare filling the unpaired vertices of the vertex range from their paired neighbours
+    def prepare_hole_filling(self):
+        self.hole_filler = None
+        if(not self.fill_unpaired_vertices):
+            return
+        matched = self.correspondence.matched
+        targets = self.get_processed_vertices()
+        if(not (targets & ~matched).any()):
+            return
+        offsets, neighbours = self.get_destination_adjacency()
+        self.hole_filler = HoleFiller(offsets, neighbours, matched, targets, self.fill_iterations)
+
+    # hash of every key to transfer, from its source deltas, the meshes and every setting changing the result
+    def get_key_hashes(self):
+        settings = {
+            "correspondence": self.get_fingerprint(),
+            "topology_tolerance": self.topology_tolerance,
+            "force_index_copy": self.force_index_copy,
+            "delta_threshold": self.delta_threshold,
+            "fill_unpaired_vertices": self.fill_unpaired_vertices,
+            "fill_iterations": self.fill_iterations,
+            "use_smoothing": self.use_smoothing,
+            "smoothing_type": self.smoothing_type,
+            "smoothing_strength": self.smoothing_strength,
+            "smoothing_iterations": self.smoothing_iterations,
+            "smoothing_vertex_group": self.smoothing_vertex_group,
+            }
+        transfer = fingerprint((), settings)
+        return {key_name: fingerprint((), {"transfer": transfer, "deltas": self.src_key_hashes[key_name]}) for key_name in self.key_names}
+
+    # hashes stored on the destination by earlier transfers
+    def read_key_hashes(self):
+        shape_keys = self.dest_mesh.data.shape_keys
+        if(not shape_keys):
+            return {}
+        return {key_name: str(key_hash) for key_name, key_hash in shape_keys.get(KEY_HASHES_PROPERTY, {}).items()}
+
+    # keep only the keys added or changed since they were last transferred to the destination
+    def select_changed_keys(self):
+        self.read_source_deltas()
+        self.key_hashes = self.get_key_hashes()
+        stored = self.read_key_hashes()
+        shape_keys = self.dest_mesh.data.shape_keys
+        dest_key_blocks = shape_keys.key_blocks if shape_keys else {}
+        # keys removed from the destination by hand are transferred again
+        self.unchanged_key_names = [key_name for key_name in self.key_names if stored.get(key_name) == self.key_hashes[key_name] and key_name in dest_key_blocks]
+        self.key_names = [key_name for key_name in self.key_names if not key_name in self.unchanged_key_names]
+        # only keys this addon transferred are removed, the other keys of the destination are never touched
+        src_key_blocks = self.src_mesh.data.shape_keys.key_blocks
+        self.deleted_key_names = [key_name for key_name in stored if not key_name in src_key_blocks and key_name in dest_key_blocks]
+
+    # remove the transferred keys deleted from the source and store the hashes of the transferred keys
+    def finish_key_hashes(self):
+        shape_keys = self.dest_mesh.data.shape_keys
+        if(not shape_keys):
+            return
+        for key_name in self.deleted_key_names:
+            # the basis is kept, every other key is relative to it
+            if(shape_keys.key_blocks[key_name] != shape_keys.reference_key):
+                self.dest_mesh.shape_key_remove(shape_keys.key_blocks[key_name])
+        stored = self.read_key_hashes()
+        for key_name in self.deleted_key_names:
+            del stored[key_name]
+        for key_name in self.key_names:
+            stored[key_name] = self.key_hashes[key_name]
+        shape_keys[KEY_HASHES_PROPERTY] = stored
+
+    # find the meshes, check them and read their basis coordinates, returns True on failure
+    def begin_transfer(self, src, dest, use_only_excluded_shape_keys = False):
+        src_object  = self.get_parent(src)
+        dest_object = self.get_parent(dest)
+        if(not(src_object and dest_object)):
+            self.failed  = True
+            self.message = "The meshes are not valid!"
+            return True
+        return self.prepare_source(src_object, use_only_excluded_shape_keys) or self.prepare_destination(dest_object)
+
+    # transfer the shape keys step by step, yields once per destination vertex while matching and once per written key
+    def iter_transfer_shape_keys(self, src, dest, use_only_excluded_shape_keys = False):
+        self.batch_count = 0
+        if(self.begin_transfer(src, dest, use_only_excluded_shape_keys)):
+            return
+        yield from self.transfer_to_destination()
+
+    # transfer from the prepared source to the prepared destination
+    def transfer_to_destination(self):
+        self.stage = 'SEARCH'
+        self.correspondence = None
+        self.correspondence_cached = False
+        self.key_names = list(self.src_key_names)
+        self.unchanged_key_names = []
+        self.deleted_key_names = []
+        if(self.only_changed_keys):
+            self.select_changed_keys()
+            if(not self.key_names):
+                # nothing to transfer, so the vertices are not matched at all
+                self.finish_key_hashes()
+                if(not self.keep_source_deltas):
+                    self.clear_source_deltas()
+                    self.buffers.clear()
+                self.stage = None
+                self.failed = False
+                self.message = "Shape keys are up to date!" + self.get_changed_keys_note()
+                return
+        self.index_copy = self.is_topology_identical()
+        if(self.index_copy):
+            count = len(self.dest_world_basis)
+            processed = self.get_processed_vertices()
+            if(self.src_mask is not None):
+                processed &= self.src_mask
+            self.correspondence = Correspondence.from_fixed_width(np.arange(count).reshape(-1, 1), np.ones((count, 1), dtype=np.float32), processed)
+        elif(self.use_cache):
+            cache = CorrespondenceCache(self.cache_directory, self.cache_max_entries)
+            cache_key = self.get_fingerprint()
+            self.correspondence = cache.load(cache_key)
+            self.correspondence_cached = self.correspondence is not None
+        if(self.correspondence is None):
+            if((yield from self.compute_correspondence())):
+                return
+            cached = False
+            if(self.use_cache):
+                try:
+                    cache.save(cache_key, self.correspondence)
+                    cached = True
+                except OSError as e:
+                    print("Could not store the vertex mapping in the cache: " + str(e))
+            # the chunks are only needed until the finished mapping is cached
+            if(cached or not self.use_cache):
+                self.clear_checkpoints()
+
+        self.stage = 'APPLY'
+        # the basis of both meshes and the correspondence are held for the whole stage
+        held = self.src_basis_co.nbytes + self.dest_world_basis.nbytes + self.correspondence.offsets.nbytes + self.correspondence.indices.nbytes + self.correspondence.weights.nbytes
+        self.memory.reserve(held, force=True)
+        in_range = np.zeros(len(self.dest_world_basis), dtype=bool)
+        in_range[self.start_vertex_index:self.total_vertices] = True
+        self.basis_vertices = self.correspondence.matched | (in_range & ~self.get_processed_vertices())
+        self.prepare_hole_filling()
+        self.read_source_deltas()
+        self.key_hashes = self.get_key_hashes()
+        if(self.skip_empty_keys):
+            self.key_names = [key_name for key_name in self.key_names if not key_name in self.empty_key_names]
         # Check if dest_mesh has any shape key if not create one
         if(not hasattr(self.dest_mesh.data.shape_keys, "key_blocks")):
             self.dest_mesh.shape_key_add(name="Basis")
+            self.added_key_names.append("Basis")
         # add missing shape keys to dest_mesh    
-        for src_shape_key_iter in self.src_mesh.data.shape_keys.key_blocks:
-            valid_shape_key = False        
-            if(use_only_excluded_shape_keys and (src_shape_key_iter.name in self.excluded_shape_keys)):
-                local_shape_key_list.append(src_shape_key_iter.name)   
-            if((not use_only_excluded_shape_keys) and (src_shape_key_iter.name in self.excluded_shape_keys)):
-                continue
-            if(use_only_excluded_shape_keys and (not (src_shape_key_iter.name in self.excluded_shape_keys))):
-                continue
-            for dest_shape_key_iter in self.dest_mesh.data.shape_keys.key_blocks:
-                if(src_shape_key_iter.name == dest_shape_key_iter.name):
-                    valid_shape_key = True
-            if(not valid_shape_key):
-                self.dest_mesh.shape_key_add(name=src_shape_key_iter.name)
-                
-
-        # all vertices in destination mesh
-        while(self.current_vertex_index < self.total_vertices):
-            self.do_once_per_vertex = True
-            print("Vertex: " + str(self.current_vertex_index + 1) + "/" + str(self.total_vertices))
-            if(use_only_excluded_shape_keys):
-                for key_name in local_shape_key_list:
-                    self.update_global_shapekey_indices(key_name)            
-                    if(self.update_vertex()):
-                        return True
-            else:
-                # Iterate all shape keys 
-                for shape_key_iter in self.src_mesh.data.shape_keys.key_blocks:    
-                    key_name = shape_key_iter.name
-                    # exclude shapekeys not needed
-                    if(not (key_name in self.excluded_shape_keys)):
-                        self.update_global_shapekey_indices(key_name)            
-                        if(self.update_vertex()):
-                            return True
-            self.current_vertex_index += 1
+        dest_key_blocks = self.dest_mesh.data.shape_keys.key_blocks
+        for key_name in self.key_names:
+            if(not key_name in dest_key_blocks):
+                self.dest_mesh.shape_key_add(name=key_name)
+                self.added_key_names.append(key_name)
+
+        for self.current_key_index, key_name in enumerate(self.key_names):
+            self.apply_shape_key(key_name, dest_key_blocks[key_name])
+            yield
+        self.current_key_index = len(self.key_names)
+        if(self.use_smoothing and self.key_names):
+            self.stage = 'SMOOTH'
+            yield
+            self.smooth_shape_keys()
+        self.finish_key_hashes()
+        if(not self.keep_source_deltas):
+            self.clear_source_deltas()
+            # a batch keeps the buffers for its next destination
+            self.buffers.clear()
+        # the transfer finished so the original keys are not needed for a rollback anymore
+        self.original_key_co.clear()
+        self.memory.release(held)
+        self.stage = None
+        self.failed = False
         self.message = "Transferred Shape Keys successfully!"
-        return False
+        if(self.index_copy):
+            self.message += " (identical vertices, copied by index)"
+        elif(self.correspondence_cached):
+            self.message += " (cached vertex mapping)"
+        if(self.hole_filler):
+            self.message += " | filled %d unpaired vertices" % len(self.hole_filler.filled)
+            if(self.hole_filler.unreached_count):
+                self.message += ", %d not connected to paired vertices" % self.hole_filler.unreached_count
+        if(self.empty_key_names):
+            self.message += " | %d empty shape keys %s: %s" % (len(self.empty_key_names), "skipped" if self.skip_empty_keys else "transferred", ", ".join(self.empty_key_names))
+        self.message += self.get_changed_keys_note()
+        self.message += self.get_shared_mesh_note(self.dest_mesh)
+        self.message += " | peak memory %.0f MB" % (self.memory.peak / MEGABYTE)
+
+    # transfer the shape keys of one source to every destination object, the source is indexed and read once
+    def iter_transfer_batch(self, src, dest_objects, use_only_excluded_shape_keys = False):
+        self.batch_summary = []
+        self.batch_count   = len(dest_objects)
+        src_object = self.get_parent(src)
+        if(self.prepare_source(src_object, use_only_excluded_shape_keys)):
+            return
+        self.keep_source_deltas = True
+        try:
+            for self.batch_index, dest_object in enumerate(dest_objects):
+                if(not self.prepare_destination(dest_object)):
+                    yield from self.transfer_to_destination()
+                if(self.failed):
+                    self.batch_summary.append((dest_object.name, 0, 0, self.message))
+                else:
+                    processed = self.get_processed_vertices()
+                    matched = int(np.count_nonzero(self.correspondence.matched & processed))
+                    self.batch_summary.append((dest_object.name, matched, int(np.count_nonzero(processed)) - matched, None))
+        finally:
+            self.keep_source_deltas = False
+            self.clear_source_deltas()
+            self.buffers.clear()
+        failures = sum(1 for summary in self.batch_summary if summary[3])
+        self.failed  = failures == len(self.batch_summary)
+        self.message = "Transferred Shape Keys to " + str(len(self.batch_summary) - failures) + "/" + str(len(self.batch_summary)) + " objects"
+        self.message += " | peak memory %.0f MB" % (self.memory.peak / MEGABYTE)
+
+    def transfer_shape_keys(self, src, dest, use_only_excluded_shape_keys = False):
+        run_steps(self.iter_transfer_shape_keys(src, dest, use_only_excluded_shape_keys))
+        return self.failed
+
+    # compute and checkpoint the correspondence of the vertex range without writing any key, used by worker processes
+    def compute_vertex_range(self, src, dest):
+        if(self.begin_transfer(src, dest)):
+            return True
+        self.stage = 'SEARCH'
+        self.failed = run_steps(self.compute_correspondence())
+        if(not self.failed):
+            self.message = "Computed vertices " + str(self.start_vertex_index) + " to " + str(self.total_vertices)
+        return self.failed
+
+    # undo the changes of an interrupted transfer on the destination mesh
+    def rollback(self):
+        if(not self.dest_mesh or not self.dest_mesh.data.shape_keys):
+            return
+        dest_key_blocks = self.dest_mesh.data.shape_keys.key_blocks
+        for key_name, co in self.original_key_co.items():
+            write_coordinates(dest_key_blocks[key_name].data, co)
+        # the basis has to be removed last
+        for key_name in reversed(self.added_key_names):
+            if(key_name in dest_key_blocks):
+                self.dest_mesh.shape_key_remove(dest_key_blocks[key_name])
+        self.added_key_names = []
+        self.original_key_co.clear()
     
     # get the default excluded shape keys
     def get_default_excluded_keys(self):
@@ -227,12 +1099,11 @@ class ShapeKeyTransfer:
 
     #get shape keys of a  mesh
     def get_shape_keys_mesh(self, mesh):
-        obj = self.get_parent(mesh)
         keys = []
-        if(not hasattr(obj.data.shape_keys, "key_blocks")):
+        if(not hasattr(mesh.shape_keys, "key_blocks")):
             self.message = "There are no Shape Keys in the mesh!"
             return True
-        for shape_key_iter in obj.data.shape_keys.key_blocks:
+        for shape_key_iter in mesh.shape_keys.key_blocks:
             keys.append(shape_key_iter.name)
         self.message = keys
         return False
@@ -326,42 +1197,197 @@ class SKT_OT_transferShapeKeys(Operator):
     bl_description = "The two meshes should overlap each other or positioned pretty close"
     bl_context = 'objectmode'
     bl_options = {'REGISTER', 'INTERNAL','UNDO'}
+
+    use_only_excluded_shape_keys = False
+    # seconds of work done per timer event while running modal
+    time_budget = 0.1
+
+    _timer = None
+    _steps = None
+    _area  = None
     
     @classmethod
     def poll(cls, context):
         return can_transfer_keys(context)
 
-    def execute(self, context):
+    # generator of the transfer steps for the current settings
+    def get_steps(self, context):
         global SKT
         skt = context.scene.shapekeytransfer
-        SKT.increment_radius = skt.increment_radius
-        SKT.use_one_vertex   = skt.use_one_vertex
-        SKT.skip_vertices_with_no_pair = skt.skip_unpaired_vertices
-        SKT.number_of_increments = skt.number_of_increments
+        SKT.load_settings(skt)
 
         SKT.update_shape_keys_list(context.scene.customshapekeylist)
-        result = SKT.transfer_shape_keys(skt.src_mesh, skt.dest_mesh)
-        if(result):
+        return SKT.iter_transfer_shape_keys(skt.src_mesh, skt.dest_mesh, self.use_only_excluded_shape_keys)
+
+    def report_result(self):
+        if(SKT.failed):
             self.report({'ERROR'}, SKT.message)            
         else:
             self.report({'INFO'}, SKT.message)
+
+    def execute(self, context):
+        run_steps(self.get_steps(context))
+        self.report_result()
         return {'FINISHED'}
+
+    # run the transfer in time budgeted chunks from a timer so the interface stays responsive
+    def invoke(self, context, event):
+        self._steps = self.get_steps(context)
+        SKT.keep_rollback = True
+        self._stage = None
+        self._stage_start = time.perf_counter()
+        self._stage_done = 0
+
+        self._area = context.area
+        wm = context.window_manager
+        wm.progress_begin(0, 1)
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if(event.type == 'ESC'):
+            return self.cancel_transfer(context)
+
+        if(event.type != 'TIMER'):
+            # keep viewport navigation available while transferring
+            if(event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'MOUSEMOVE'}):
+                return {'PASS_THROUGH'}
+            return {'RUNNING_MODAL'}
+
+        end_time = time.perf_counter() + self.time_budget
+        try:
+            while(time.perf_counter() < end_time):
+                next(self._steps)
+        except StopIteration:
+            self.finish(context)
+            self.report_result()
+            if(SKT.failed):
+                SKT.rollback()
+                return {'CANCELLED'}
+            return {'FINISHED'}
+        except Exception:
+            SKT.rollback()
+            self.finish(context)
+            raise
+
+        self.update_progress(context)
+        return {'RUNNING_MODAL'}
+
+    # undo the unfinished transfer when Esc is pressed
+    def cancel_transfer(self, context):
+        SKT.rollback()
+        self.finish(context)
+        self.report({'WARNING'}, "Shape key transfer cancelled")
+        return {'CANCELLED'}
+
+    # update the progress bar and show throughput and remaining time in the header
+    def update_progress(self, context):
+        if(SKT.stage == 'SEARCH'):
+            done  = SKT.current_vertex_index - SKT.start_vertex_index
+            total = SKT.total_vertices - SKT.start_vertex_index
+            unit  = "vertices"
+        else:
+            done  = SKT.current_key_index
+            total = len(SKT.key_names)
+            unit  = "keys"
+        if((SKT.stage, SKT.batch_index) != self._stage):
+            self._stage = (SKT.stage, SKT.batch_index)
+            self._stage_start = time.perf_counter()
+            self._stage_done = done
+
+        elapsed = time.perf_counter() - self._stage_start
+        rate = (done - self._stage_done) / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate > 0 else 0.0
+        vertices = SKT.total_vertices - SKT.start_vertex_index
+        context.window_manager.progress_update((SKT.current_vertex_index - SKT.start_vertex_index + SKT.current_key_index) / max(vertices + len(SKT.key_names), 1))
+        objects = ""
+        if(SKT.batch_count):
+            objects = "object %d/%d | " % (SKT.batch_index + 1, SKT.batch_count)
+        if(self._area):
+            self._area.header_text_set("Transfer Shape Keys: %s%s %d/%d | %.0f %s/s | ETA %.0fs | Esc to cancel" % (objects, unit, done, total, rate, unit, eta))
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        if(self._area):
+            self._area.header_text_set(None)
+        # stops worker processes of an unfinished transfer
+        self._steps.close()
+        self._steps = None
+        SKT.keep_rollback = False
     
     def draw(self, context):
         layout = self.layout
         skt = context.scene.shapekeytransfer
         col = layout.column()
+        col.prop(skt, "transfer_mode")
         col.label(text="Vertex influence:")       
         col.prop(skt, "increment_radius")
-        col.prop(skt, "use_one_vertex")
+        if(skt.transfer_mode == 'NEAREST'):
+            col.prop(skt, "neighbour_count")
+            col.prop(skt, "neighbour_weighting")
+            sub = col.column()
+            sub.enabled = skt.neighbour_weighting == 'GAUSSIAN'
+            sub.prop(skt, "gaussian_radius")
+        else:
+            col.prop(skt, "use_one_vertex")
         col.prop(skt, "skip_unpaired_vertices")
+        col.prop(skt, "fill_unpaired_vertices")
+        sub = col.column()
+        sub.enabled = skt.fill_unpaired_vertices
+        sub.prop(skt, "fill_iterations")
         col.prop(skt, "number_of_increments")
+        col.prop(skt, "solver_processes")
+        col.label(text="Identical meshes:")
+        col.prop(skt, "topology_tolerance")
+        col.prop(skt, "force_index_copy")
+        col.label(text="Static vertices:")
+        col.prop(skt, "delta_threshold")
+        col.prop(skt, "skip_empty_keys")
+        col.prop(skt, "only_changed_keys")
+        col.label(text="Smoothing:")
+        col.prop(skt, "use_smoothing")
+        sub = col.column()
+        sub.enabled = skt.use_smoothing
+        sub.prop(skt, "smoothing_type")
+        sub.prop(skt, "smoothing_strength")
+        sub.prop(skt, "smoothing_iterations")
+        dest_object = SKT.get_parent(skt.dest_mesh) if skt.dest_mesh else None
+        if(dest_object):
+            sub.prop_search(skt, "smoothing_vertex_group", dest_object, "vertex_groups")
+        else:
+            sub.prop(skt, "smoothing_vertex_group")
+        col.label(text="Vertex mapping cache:")
+        col.prop(skt, "use_cache")
+        col.prop(skt, "cache_directory")
+        col.prop(skt, "cache_max_entries")
+        col.label(text="Masks:")
+        for mesh, prop in ((skt.src_mesh, "src_vertex_group"), (skt.dest_mesh, "dest_vertex_group")):
+            obj = SKT.get_parent(mesh) if mesh else None
+            if(obj):
+                col.prop_search(skt, prop, obj, "vertex_groups")
+            else:
+                col.prop(skt, prop)
+        col.prop(skt, "bounds_object")
+        col.label(text="Vertex range:")
+        col.prop(skt, "start_vertex")
+        col.prop(skt, "specify_end_vertex")
+        sub = col.column()
+        sub.enabled = skt.specify_end_vertex
+        sub.prop(skt, "end_vertex")
+        col.prop(skt, "memory_budget")
+        col.label(text="Checkpoints:")
+        col.prop(skt, "use_checkpoints")
+        col.prop(skt, "checkpoint_directory")
+        col.prop(skt, "chunk_size")
 
 
 # Transfer Shape Keys in excluded shape keys list Button  (Operator)
 # ----------------------------------------------------------
 
-class SKT_OT_transferExcludedShapeKeys(Operator):
+class SKT_OT_transferExcludedShapeKeys(SKT_OT_transferShapeKeys):
     """Transfers Shape Keys from excluded Shape key list"""
     bl_idname = "skt.transfer_excluded_shape_keys"
     bl_label = "Transfer Excluded Shape Keys Only"
@@ -369,36 +1395,155 @@ class SKT_OT_transferExcludedShapeKeys(Operator):
     bl_context = 'objectmode'
     bl_options = {'REGISTER', 'INTERNAL','UNDO'}
 
+    use_only_excluded_shape_keys = True
+        
+
+# Transfer Shape Keys to many objects Button (Operator)
+# ----------------------------------------------------------
+
+# mesh objects receiving the shape keys in a batch transfer: the destination collection or else the selection
+def get_batch_destinations(context):
+    skt = context.scene.shapekeytransfer
+    if(skt.dest_collection):
+        objects = skt.dest_collection.all_objects
+    else:
+        objects = context.selected_objects
+    # objects sharing a mesh share its shape keys, so every mesh is transferred once
+    destinations = []
+    meshes = set()
+    for ob in objects:
+        if(ob.type == 'MESH' and ob.data != skt.src_mesh and not ob.data.as_pointer() in meshes):
+            meshes.add(ob.data.as_pointer())
+            destinations.append(ob)
+    return destinations
+
+class SKT_OT_transferShapeKeysBatch(SKT_OT_transferShapeKeys):
+    """Transfers Shape Keys to every object of the Destination Collection or the selection"""
+    bl_idname = "skt.transfer_shape_keys_batch"
+    bl_label = "Transfer Shape Keys to Many"
+    bl_description = "Transfer the Shape Keys of the Source Mesh to every mesh in the Destination Collection, or to the selected meshes when no collection is set"
+    bl_context = 'objectmode'
+    bl_options = {'REGISTER', 'INTERNAL','UNDO'}
+
     @classmethod
     def poll(cls, context):
-        return can_transfer_keys(context)
+        skt = context.scene.shapekeytransfer
+        return skt.src_mesh is not None and len(get_batch_destinations(context)) > 0
 
-    def execute(self, context):
+    def get_steps(self, context):
         global SKT
         skt = context.scene.shapekeytransfer
-        SKT.increment_radius = skt.increment_radius
-        SKT.use_one_vertex   = skt.use_one_vertex
-        SKT.skip_vertices_with_no_pair = skt.skip_unpaired_vertices
-        SKT.number_of_increments = skt.number_of_increments
-        
+        SKT.load_settings(skt)
+
         SKT.update_shape_keys_list(context.scene.customshapekeylist)
-        result = SKT.transfer_shape_keys(skt.src_mesh, skt.dest_mesh, True)
-        if(result):
-            self.report({'ERROR'}, SKT.message)            
-        else:
-            self.report({'INFO'}, SKT.message)
+        return SKT.iter_transfer_batch(skt.src_mesh, get_batch_destinations(context), self.use_only_excluded_shape_keys)
+
+    # one line per finished destination object
+    def report_destinations(self):
+        for name, matched, unpaired, error in SKT.batch_summary:
+            if(error):
+                self.report({'WARNING'}, "%s: %s" % (name, error))
+            else:
+                self.report({'INFO'}, "%s: %d vertices matched, %d unpaired" % (name, matched, unpaired))
+
+    # one line per destination object then the total
+    def report_result(self):
+        self.report_destinations()
+        super().report_result()
+
+    # only the destination in progress is rolled back, the finished ones keep their keys and get an undo step
+    def cancel_transfer(self, context):
+        SKT.rollback()
+        self.finish(context)
+        if(not SKT.batch_summary):
+            self.report({'WARNING'}, "Shape key transfer cancelled")
+            return {'CANCELLED'}
+        self.report_destinations()
+        self.report({'WARNING'}, "Shape key transfer cancelled after %d/%d objects" % (len(SKT.batch_summary), SKT.batch_count))
         return {'FINISHED'}
-    
-    def draw(self, context):
+
+
+# Match vertex ranges in background Blender processes Button (Operator)
+# ----------------------------------------------------------
+
+class SKT_OT_dispatchWorkers(Operator):
+    """Match vertex ranges in background Blender processes and transfer the merged result"""
+    bl_idname = "skt.dispatch_workers"
+    bl_label = "Transfer with Background Workers"
+    bl_description = "Split the destination vertices into ranges matched by separate background Blender processes, then transfer the shape keys from the merged checkpoints"
+    bl_context = 'objectmode'
+    bl_options = {'INTERNAL'}
+
+    _timer = None
+    _processes = []
+    _blend_copy = ""
+
+    @classmethod
+    def poll(cls, context):
+        return can_transfer_keys(context)
+
+    def invoke(self, context, event):
+        global SKT
         skt = context.scene.shapekeytransfer
-        layout = self.layout
-        col = layout.column()
-        col.label(text="Vertex influence:")       
-        col.prop(skt, "increment_radius")
-        col.prop(skt, "use_one_vertex")
-        col.prop(skt, "skip_unpaired_vertices")
-        col.prop(skt, "number_of_increments")
-        
+        SKT.load_settings(skt)
+        if(not SKT.use_checkpoints):
+            self.report({'ERROR'}, "Workers hand their results over as checkpoints, enable Use Checkpoints")
+            return {'CANCELLED'}
+        dest = SKT.get_parent(skt.dest_mesh)
+        if(not dest):
+            self.report({'ERROR'}, "The meshes are not valid!")
+            return {'CANCELLED'}
+        start, end = SKT.get_vertex_range(len(dest.data.vertices))
+        ranges = split_vertex_range(start, end, skt.worker_count, SKT.chunk_size)
+
+        # the workers read the meshes and settings from a copy of the current file
+        checkpoint_directory = CheckpointStore(SKT.checkpoint_directory).directory
+        os.makedirs(checkpoint_directory, exist_ok=True)
+        self._blend_copy = os.path.join(checkpoint_directory, "workers_%d.blend" % (os.getpid()))
+        bpy.ops.wm.save_as_mainfile(filepath=self._blend_copy, copy=True)
+
+        self._processes = []
+        for range_start, range_end in ranges:
+            self._processes.append(start_worker(bpy.app.binary_path, self._blend_copy, __package__, range_start, range_end, checkpoint_directory))
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.5, window=context.window)
+        wm.modal_handler_add(self)
+        self.report({'INFO'}, "Started %d workers" % (len(self._processes)))
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if(event.type == 'ESC'):
+            for process in self._processes:
+                process.terminate()
+            self.finish(context)
+            self.report({'WARNING'}, "Workers stopped, finished chunks are kept as checkpoints")
+            return {'CANCELLED'}
+        if(event.type != 'TIMER'):
+            return {'PASS_THROUGH'}
+
+        running = [process for process in self._processes if process.poll() is None]
+        if(context.area):
+            context.area.header_text_set("Transfer Shape Keys: %d/%d workers finished | Esc to stop" % (len(self._processes) - len(running), len(self._processes)))
+        if(running):
+            return {'RUNNING_MODAL'}
+
+        self.finish(context)
+        failed = [process for process in self._processes if process.returncode != 0]
+        if(failed):
+            self.report({'ERROR'}, "%d workers failed, see the worker logs in the checkpoint directory" % (len(failed)))
+            return {'CANCELLED'}
+        # every range is checkpointed now, the transfer only merges them and writes the keys
+        bpy.ops.skt.transfer_shape_keys('INVOKE_DEFAULT')
+        return {'FINISHED'}
+
+    def finish(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        if(context.area):
+            context.area.header_text_set(None)
+        if(os.path.isfile(self._blend_copy)):
+            os.remove(self._blend_copy)
+
 
 # Remove all Shape Keys in source mesh Button (Operator)
 # ----------------------------------------------------------
@@ -420,21 +1565,36 @@ class SKT_OT_removeShapeKeys(Operator):
         global SKT
         skt = context.scene.shapekeytransfer        
         if(skt.src_mesh):
-            ob = SKT.get_parent(skt.src_mesh)
-            if(ob.data.shape_keys):
-                basis = None
-                for x in ob.data.shape_keys.key_blocks:
-                    if(basis):
-                        ob.shape_key_remove(x)
-                    else:
-                        basis = x
-                ob.shape_key_remove(basis)
-            self.report({'INFO'}, "Removed all shape keys in source mesh!")
+            users = SKT.get_users(skt.src_mesh)
+            if(users and skt.src_mesh.shape_keys):
+                # the keys belong to the mesh so this removes them from every object using it
+                users[0].shape_key_clear()
+            message = "Removed all shape keys in source mesh!"
+            if(len(users) > 1):
+                message += " It is shared by %d objects." % len(users)
+            self.report({'INFO'}, message)
         else:
             self.report({'ERROR'}, "Select a valid source mesh!")            
         return {'FINISHED'}
     
 
+# Clear stored vertex mappings Button (Operator)
+# ----------------------------------------------------------
+
+class SKT_OT_clearCache(Operator):
+    """Remove all stored vertex mappings"""
+    bl_idname = "skt.clear_cache"
+    bl_label = "Clear Vertex Mapping Cache"
+    bl_description = "Remove all vertex mappings stored by previous transfers"
+    bl_options = {'INTERNAL'}
+
+    def execute(self, context):
+        skt = context.scene.shapekeytransfer
+        removed = CorrespondenceCache(bpy.path.abspath(skt.cache_directory)).clear()
+        self.report({'INFO'}, "Removed %d stored vertex mappings" % (removed))
+        return {'FINISHED'}
+
+
 # Manage customshapekeylist items (Operator)
 # ----------------------------------------------------------
 
@@ -617,12 +1777,18 @@ class SKT_PT_view3D(Panel):
 
         layout.prop(skt, "src_mesh", text="Source Mesh") 
         layout.prop(skt, "dest_mesh", text="Destination Mesh")
+        layout.prop(skt, "dest_collection", text="Destination Collection")
 
         layout.separator()
         layout.operator(SKT_OT_transferShapeKeys.bl_idname, icon='ARROW_LEFTRIGHT')
         layout.operator(SKT_OT_transferExcludedShapeKeys.bl_idname, icon='KEYINGSET')
+        layout.operator(SKT_OT_transferShapeKeysBatch.bl_idname, icon='OUTLINER_COLLECTION')
+        row = layout.row(align=True)
+        row.operator(SKT_OT_dispatchWorkers.bl_idname, icon='SYSTEM')
+        row.prop(skt, "worker_count")
         layout.separator()
         layout.operator(SKT_OT_removeShapeKeys.bl_idname, icon='CANCEL')
+        layout.operator(SKT_OT_clearCache.bl_idname, icon='TRASH')
 
         layout.separator()
         layout.label(text="Excluded Shape Keys")
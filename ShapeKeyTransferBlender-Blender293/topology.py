@@ -0,0 +1,186 @@
+#----------------------------------------------------------
+# File topology.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+# Mesh connectivity as numpy arrays, this module does not depend on bpy.
+
+import numpy as np
+
+from . correspondence import expand_ranges, segment_sum
+
+
+# Vertex to vertex adjacency of a mesh in compressed sparse rows
+# ----------------------------------------------------------
+
+def edge_adjacency(edges, count):
+    """
+    Neighbours of every vertex from an (m, 2) array of edges.
+
+    Vertex i is connected to neighbours[offsets[i]:offsets[i + 1]].
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    rows = np.concatenate((edges[:, 0], edges[:, 1]))
+    columns = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.argsort(rows, kind='stable')
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(rows, minlength=count))
+    return offsets, columns[order].astype(np.int32)
+
+# compressed rows of only the given rows, returns their offsets and values
+def select_rows(offsets, values, rows):
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    row_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    row_offsets[1:] = np.cumsum(counts)
+    return row_offsets, values[expand_ranges(starts, counts)]
+
+# compressed rows keeping only the values where keep is True
+def filter_rows(offsets, values, keep):
+    row_offsets = np.zeros(len(offsets), dtype=np.int64)
+    row_offsets[1:] = np.cumsum(segment_sum(keep.astype(np.int64), offsets))
+    return row_offsets, values[keep]
+
+
+# Propagate values from known vertices over the mesh edges
+# ----------------------------------------------------------
+
+class HoleFiller:
+    """
+    Fills target vertices from known vertices in breadth first layers.
+
+    Every layer takes the mean of its neighbours filled before it, then
+    iterations Jacobi steps relax the filled vertices towards the mean of
+    all their filled neighbours while the known vertices stay fixed.
+    Targets not connected to any known vertex keep the value 0.
+    """
+    def __init__(self, offsets, neighbours, known, targets, iterations=10):
+        self.targets = np.flatnonzero(targets & ~known)
+        self.iterations = iterations
+        self.layers = []
+        reached = known.copy()
+        remaining = np.zeros(len(known), dtype=bool)
+        remaining[self.targets] = True
+        candidates = self.targets
+        while(len(candidates)):
+            candidate_offsets, candidate_neighbours = select_rows(offsets, neighbours, candidates)
+            layer = candidates[segment_sum(reached[candidate_neighbours].astype(np.int64), candidate_offsets) > 0]
+            if(len(layer) == 0):
+                break
+            layer_offsets, layer_neighbours = select_rows(offsets, neighbours, layer)
+            self.layers.append((layer,) + filter_rows(layer_offsets, layer_neighbours, reached[layer_neighbours]))
+            reached[layer] = True
+            remaining[layer] = False
+            # only neighbours of the new layer can be reached next
+            candidates = np.unique(layer_neighbours[remaining[layer_neighbours]])
+        self.filled = np.concatenate([layer[0] for layer in self.layers]) if self.layers else np.zeros(0, dtype=np.int64)
+        filled_offsets, filled_neighbours = select_rows(offsets, neighbours, self.filled)
+        self.filled_offsets, self.filled_neighbours = filter_rows(filled_offsets, filled_neighbours, reached[filled_neighbours])
+        self.filled_counts = np.diff(self.filled_offsets).reshape((-1, 1))
+
+    # number of targets not connected to any known vertex
+    @property
+    def unreached_count(self):
+        return len(self.targets) - len(self.filled)
+
+    # values of every target vertex from values of the known vertices, the rows of the targets in values are overwritten
+    def fill(self, values):
+        values[self.targets] = 0
+        for layer, layer_offsets, layer_neighbours in self.layers:
+            counts = np.diff(layer_offsets).reshape((-1,) + (1,) * (values.ndim - 1))
+            values[layer] = segment_sum(values[layer_neighbours], layer_offsets) / counts
+        counts = self.filled_counts.reshape((-1,) + (1,) * (values.ndim - 1))
+        for iteration in range(self.iterations):
+            values[self.filled] = segment_sum(values[self.filled_neighbours], self.filled_offsets) / counts
+        return values[self.targets]
+
+
+# Sum duplicate (row, column) entries into compressed sparse rows
+# ----------------------------------------------------------
+
+def sum_entries(rows, columns, weights, count):
+    order = np.lexsort((columns, rows))
+    rows, columns, weights = rows[order], columns[order], weights[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+    starts = np.flatnonzero(first)
+    weights = np.add.reduceat(weights, starts) if len(starts) else weights
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(rows[starts], minlength=count))
+    return offsets, columns[starts].astype(np.int32), weights
+
+
+# Weighted neighbour mean of every vertex, used to smooth per vertex values
+# ----------------------------------------------------------
+
+class Laplacian:
+    """
+    Sparse matrix W with rows summing to 1, so W @ values is the weighted
+    mean of the neighbours of every vertex and W @ values - values its
+    Laplacian. Vertices without neighbours are never changed.
+    """
+    def __init__(self, offsets, columns, weights):
+        self.offsets = offsets
+        self.columns = columns
+        totals = segment_sum(weights, offsets)
+        self.has_neighbours = totals > 0
+        totals[~self.has_neighbours] = 1.0
+        self.weights = (weights / np.repeat(totals, np.diff(offsets))).astype(np.float32)
+
+    # every neighbour weighs the same
+    @classmethod
+    def uniform(cls, offsets, neighbours):
+        return cls(offsets, neighbours, np.ones(len(neighbours), dtype=np.float64))
+
+    # neighbours across an edge weigh the cotangents of the angles opposite to it
+    @classmethod
+    def cotangent(cls, co, triangles, count):
+        co = np.asarray(co, dtype=np.float64)
+        rows = []
+        columns = []
+        weights = []
+        for corner in range(3):
+            i = triangles[:, corner]
+            j = triangles[:, (corner + 1) % 3]
+            k = triangles[:, (corner + 2) % 3]
+            a = co[j] - co[i]
+            b = co[k] - co[i]
+            # cotangent of the angle at corner i, which is opposite to edge j k
+            cross = np.linalg.norm(np.cross(a, b), axis=1)
+            cot = (a * b).sum(axis=1) / np.maximum(cross, 1e-12)
+            # obtuse angles give negative weights which make smoothing unstable
+            cot = np.clip(cot, 0.0, None) * 0.5
+            rows += [j, k]
+            columns += [k, j]
+            weights += [cot, cot]
+        return cls(*sum_entries(np.concatenate(rows).astype(np.int64), np.concatenate(columns), np.concatenate(weights), count))
+
+    # W @ values for (n, ...) values, several value sets can be stacked on the later axes
+    def multiply(self, values):
+        return segment_sum(values[self.columns] * self.weights.reshape((-1,) + (1,) * (values.ndim - 1)), self.offsets)
+
+    # move values towards their neighbour mean by strength (0 to 1) per iteration, scaled by the per vertex mask
+    def smooth(self, values, strength, iterations, mask=None):
+        factor = np.where(self.has_neighbours, strength, 0.0).astype(np.float32)
+        if(mask is not None):
+            factor *= mask
+        factor = factor.reshape((-1,) + (1,) * (values.ndim - 1))
+        for iteration in range(iterations):
+            values = values + factor * (self.multiply(values) - values)
+        return values
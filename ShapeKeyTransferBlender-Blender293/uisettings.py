@@ -23,6 +23,7 @@ import bpy
 
 from bpy.props import (StringProperty,
                        BoolProperty,
+                       EnumProperty,
                        IntProperty,
                        FloatProperty,
                        PointerProperty)
@@ -52,12 +53,70 @@ class SKT_PG_settings(PropertyGroup):
         update=None
         )
 
+    dest_collection: PointerProperty(
+        type=bpy.types.Collection, 
+        name="Destination Collection", 
+        description="Meshes receiving the shape keys when transferring to many objects, the selected objects are used when empty"
+        )
+
+    start_vertex: IntProperty(
+        name = "Start Vertex",
+        description = "Index of the first destination vertex to transfer.",
+        default = 0,
+        min = 0
+        )
+
     specify_end_vertex: BoolProperty(
         name="Specify End Vertex",
         description="Execute till last vertex specified.",
         default = False
         )
 
+    end_vertex: IntProperty(
+        name = "End Vertex",
+        description = "Index after the last destination vertex to transfer when Specify End Vertex is enabled.",
+        default = 0,
+        min = 0
+        )
+
+    transfer_mode: EnumProperty(
+        name="Transfer Mode",
+        description="How destination vertices are matched to the source mesh.",
+        items=(
+            ('SPHERE', "Sphere Search", "Grow a selection sphere around every vertex until source vertices are found"),
+            ('SURFACE', "Surface Projection", "Project every vertex onto the closest source triangle and blend its corners"),
+            ('NEAREST', "K Nearest", "Blend a fixed number of the closest source vertices weighted by their distance")),
+        default = 'SPHERE'
+        )
+
+    neighbour_count: IntProperty(
+        name="Neighbours",
+        description="Number of closest source vertices blended into every destination vertex.",
+        default = 4,
+        min = 1,
+        soft_max = 16,
+        max = 64
+        )
+
+    neighbour_weighting: EnumProperty(
+        name="Weighting",
+        description="How the closest source vertices are weighted by their distance.",
+        items=(
+            ('INVERSE_DISTANCE', "Inverse Distance", "Weight by one over the squared distance"),
+            ('GAUSSIAN', "Gaussian", "Weight by a gaussian falloff of the distance")),
+        default = 'INVERSE_DISTANCE'
+        )
+
+    gaussian_radius: FloatProperty(
+        name = "Gaussian Radius",
+        description = "Standard deviation of the gaussian weighting, neighbours further away than this lose influence quickly.",
+        default = 0.01,
+        soft_min = 0.001,
+        soft_max  = 0.1,
+        min = 0.000001,
+        precision = 4
+        )
+
     use_one_vertex: BoolProperty(
         name="Use Closest Vertex",
         description="Use the position of the closet vertex only or several vertices within the range.",
@@ -70,6 +129,20 @@ class SKT_PG_settings(PropertyGroup):
         default = True
         )
 
+    fill_unpaired_vertices: BoolProperty(
+        name="Fill unpaired vertices",
+        description="Give vertices which cant find nearby vertices in the source mesh the shape of their paired neighbours along the mesh edges instead of the basis.",
+        default = False
+        )
+
+    fill_iterations: IntProperty(
+        name="Fill Smoothing",
+        description="Smoothing steps of the filled vertices after they were filled from their neighbours.",
+        default = 10,
+        min = 0,
+        soft_max = 100
+        )
+
     increment_radius: FloatProperty(
         name = "Increment Radius",
         description = "Radius to increment selection sphere.",
@@ -88,6 +161,166 @@ class SKT_PG_settings(PropertyGroup):
         min = 1
         )
 
+    solver_processes: IntProperty(
+        name = "Solver Processes",
+        description = "Match vertices with the NumPy solver in this many separate processes, 1 searches inside Blender. Sphere Search only.",
+        default = 1,
+        soft_min = 1,
+        soft_max  = 32,
+        min = 1
+        )
+
+    topology_tolerance: FloatProperty(
+        name = "Identical Vertex Tolerance",
+        description = "When both meshes have the same vertex count and every vertex lies within this distance of its counterpart, shape keys are copied by vertex index without searching.",
+        default = 0.0001,
+        soft_min = 0.0,
+        soft_max  = 0.01,
+        min = 0.0,
+        precision = 5
+        )
+
+    force_index_copy: BoolProperty(
+        name="Force Copy by Index",
+        description="Copy shape keys by vertex index whenever both meshes have the same vertex count, even if their vertices moved.",
+        default = False
+        )
+
+    delta_threshold: FloatProperty(
+        name = "Static Vertex Threshold",
+        description = "Source vertices moving less than this distance on every axis in a shape key are treated as static. Destination vertices matched only to static vertices get the basis written directly.",
+        default = 0.000001,
+        soft_min = 0.0,
+        soft_max  = 0.001,
+        min = 0.0,
+        precision = 6
+        )
+
+    skip_empty_keys: BoolProperty(
+        name="Skip Empty Shape Keys",
+        description="Do not transfer shape keys where no source vertex moves, they are always listed in the report.",
+        default = False
+        )
+
+    only_changed_keys: BoolProperty(
+        name="Only Changed Shape Keys",
+        description="Transfer only the shape keys added or changed in the source since the last transfer to the destination, and remove the transferred keys deleted from the source.",
+        default = False
+        )
+
+    use_smoothing: BoolProperty(
+        name="Smooth Transferred Keys",
+        description="Smooth the deltas of all transferred shape keys over the destination mesh to remove faceting from a coarse source.",
+        default = False
+        )
+
+    smoothing_type: EnumProperty(
+        name="Smoothing Type",
+        description="How neighbouring vertices are weighted while smoothing.",
+        items=(
+            ('UNIFORM', "Uniform", "Every neighbour connected by an edge weighs the same"),
+            ('COTANGENT', "Cotangent", "Neighbours are weighted by the angles of the faces around the edge, which keeps the shape on uneven meshes")),
+        default = 'UNIFORM'
+        )
+
+    smoothing_strength: FloatProperty(
+        name = "Smoothing Strength",
+        description = "How far the deltas move towards the mean of their neighbours in every iteration.",
+        default = 0.5,
+        min = 0.0,
+        max = 1.0
+        )
+
+    smoothing_iterations: IntProperty(
+        name="Smoothing Iterations",
+        description="Number of smoothing steps.",
+        default = 5,
+        min = 0,
+        soft_max = 50
+        )
+
+    smoothing_vertex_group: StringProperty(
+        name="Smoothing Vertex Group",
+        description="Only smooth vertices of this destination vertex group, scaled by their weight. Leave empty to smooth every vertex."
+        )
+
+    src_vertex_group: StringProperty(
+        name="Source Vertex Group",
+        description="Only match destination vertices to source vertices of this vertex group. Leave empty to use every source vertex."
+        )
+
+    dest_vertex_group: StringProperty(
+        name="Destination Vertex Group",
+        description="Only transfer to destination vertices of this vertex group, the other vertices get the basis. Leave empty to use every destination vertex."
+        )
+
+    bounds_object: PointerProperty(
+        type=bpy.types.Object,
+        name="Bounds Object",
+        description="Only transfer to destination vertices inside the bounding box of this object, for example an empty or a cube around the face. The other vertices get the basis."
+        )
+
+    memory_budget: IntProperty(
+        name="Memory Budget (MB)",
+        description="Memory the transfer may use to keep source deltas and the original keys for cancelling. Above it deltas are read again for every key and original keys are stored in temporary files.",
+        default = 1024,
+        min = 64,
+        soft_max = 16384
+        )
+
+    use_cache: BoolProperty(
+        name="Cache Vertex Mapping",
+        description="Store the computed vertex mapping on disk and reuse it while the meshes and settings are unchanged.",
+        default = True
+        )
+
+    cache_directory: StringProperty(
+        name = "Cache Directory",
+        description = "Directory for stored vertex mappings, leave empty to use the system temporary directory.",
+        default = "",
+        subtype = 'DIR_PATH'
+        )
+
+    cache_max_entries: IntProperty(
+        name = "Cache Entries",
+        description = "Maximum number of stored vertex mappings, the least recently used ones are removed first.",
+        default = 32,
+        soft_min = 1,
+        soft_max  = 256,
+        min = 1
+        )
+
+    use_checkpoints: BoolProperty(
+        name="Use Checkpoints",
+        description="Store every finished chunk of vertices on disk so an interrupted transfer resumes from the last finished chunk.",
+        default = True
+        )
+
+    checkpoint_directory: StringProperty(
+        name = "Checkpoint Directory",
+        description = "Directory for finished chunks, leave empty to use the system temporary directory. Worker processes share it.",
+        default = "",
+        subtype = 'DIR_PATH'
+        )
+
+    chunk_size: IntProperty(
+        name = "Chunk Size",
+        description = "Number of destination vertices per checkpoint.",
+        default = 10000,
+        soft_min = 100,
+        soft_max  = 1000000,
+        min = 1
+        )
+
+    worker_count: IntProperty(
+        name = "Workers",
+        description = "Number of background Blender processes matching separate vertex ranges.",
+        default = 4,
+        soft_min = 1,
+        soft_max  = 64,
+        min = 1
+        )
+
 # Property of 1 item in the excluded shape key list
 # ----------------------------------------------------------
 
@@ -0,0 +1,59 @@
+#----------------------------------------------------------
+# File worker.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+# Matches one range of destination vertices and stores it as checkpoints.
+# Started by SKT_OT_dispatchWorkers as:
+#   blender --background file.blend --python worker.py -- <addon package> <start> <end> <checkpoint directory>
+# The meshes and settings are taken from the shape key transfer settings saved in the scene.
+
+import os
+import sys
+import importlib
+import bpy
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:]
+    package = argv[0]
+    start, end = int(argv[1]), int(argv[2])
+    checkpoint_directory = argv[3]
+
+    # the folder containing this addon
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    addon = importlib.import_module(package)
+    addon.register()
+
+    skt = bpy.context.scene.shapekeytransfer
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    engine.load_settings(skt)
+    engine.start_vertex_index   = start
+    engine.specify_end_vertex   = True
+    engine.total_vertices       = end
+    engine.use_checkpoints      = True
+    engine.checkpoint_directory = checkpoint_directory
+
+    failed = engine.compute_vertex_range(skt.src_mesh, skt.dest_mesh)
+    print(engine.message)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#----------------------------------------------------------
+# File workers.py
+#----------------------------------------------------------
+#
+# ShapeKeyTransfer - Copyright (C) 2018 Ajit Christopher D'Monte
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# ----------------------------------------------------------
+
+import os
+import subprocess
+
+# script run by every background Blender process
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+# script transferring the shape keys of one file as described by a job manifest
+BATCH_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "batch.py")
+
+
+# Split a vertex range into ranges for separate processes
+# ----------------------------------------------------------
+
+def split_vertex_range(start, end, parts, chunk_size):
+    """Split start..end into at most parts ranges whose inner boundaries are multiples of chunk_size"""
+    if(start >= end):
+        return []
+    boundaries = [start] + list(range((start // chunk_size + 1) * chunk_size, end, chunk_size)) + [end]
+    chunk_count = len(boundaries) - 1
+    parts = max(1, min(parts, chunk_count))
+    ranges = []
+    for i in range(parts):
+        ranges.append((boundaries[i * chunk_count // parts], boundaries[(i + 1) * chunk_count // parts]))
+    return ranges
+
+
+# Start one background Blender process matching a vertex range
+# ----------------------------------------------------------
+
+def start_worker(blender_binary, blend_file, package, start, end, checkpoint_directory):
+    """Returns the Popen of the worker, its output goes to a log file in the checkpoint directory"""
+    command = [blender_binary, "--background", "--factory-startup", blend_file,
+               "--python", WORKER_SCRIPT, "--",
+               package, str(start), str(end), checkpoint_directory]
+    log_path = os.path.join(checkpoint_directory, "worker_%d_%d.log" % (start, end))
+    with open(log_path, "w") as log:
+        return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+
+
+# Start one background Blender process running a batch job on a file
+# ----------------------------------------------------------
+
+def start_batch_job(blender_binary, blend_file, manifest_path, report_path, output_path=""):
+    """Returns the Popen of the job, its output goes to a log file next to the report"""
+    command = [blender_binary, "--background", "--factory-startup", blend_file,
+               "--python", BATCH_SCRIPT, "--",
+               manifest_path, report_path]
+    if(output_path):
+        command.append(output_path)
+    log_path = os.path.splitext(report_path)[0] + ".log"
+    with open(log_path, "w") as log:
+        return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
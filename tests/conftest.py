@@ -0,0 +1,19 @@
+# The shape key transfer addon is imported with the stand-in bpy and mathutils of its benchmark,
+# so the tests run with plain CPython.
+
+import os
+import sys
+import pytest
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPOSITORY, "ShapeKeyTransferBlender-Blender293", "benchmark"))
+
+import benchmark
+
+
+@pytest.fixture
+def addon():
+    bpy, skt_module = benchmark.import_engine()
+    bpy.data.objects.clear()
+    skt_module.MESH_USERS.invalidate()
+    return sys.modules[benchmark.ADDON_PACKAGE]
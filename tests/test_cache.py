@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+
+import benchmark
+
+
+def make_engine(addon, directory):
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    engine.transfer_mode = 'SURFACE'
+    engine.use_cache = True
+    engine.cache_directory = os.path.join(directory, "cache")
+    engine.use_checkpoints = False
+    return engine
+
+
+# the surface projection depends on the source faces, new faces over the same vertices need a new mapping
+def test_surface_mapping_follows_source_faces(addon, tmp_path):
+    bpy = sys.modules["bpy"]
+    src_co, src_triangles = benchmark.grid(400)
+    dest_co, dest_triangles = benchmark.grid(600, shift=0.33)
+    src = benchmark.add_mesh(bpy, "source", src_co, src_triangles, benchmark.KEYS)
+    dest = benchmark.add_mesh(bpy, "destination", dest_co, dest_triangles)
+
+    engine = make_engine(addon, str(tmp_path))
+    assert not engine.transfer_shape_keys(src.data, dest.data)
+    assert "cached" not in engine.message
+    engine = make_engine(addon, str(tmp_path))
+    assert not engine.transfer_shape_keys(src.data, dest.data)
+    assert "cached vertex mapping" in engine.message
+
+    # flip the diagonal of every cell, the grid has the (00, 10, 11) triangles first then the (00, 11, 01) ones
+    a, b = np.split(src_triangles, 2)
+    src.data.loop_triangles.values[...] = np.concatenate((np.stack((a[:, 0], a[:, 1], b[:, 2]), axis=1), np.stack((a[:, 1], a[:, 2], b[:, 2]), axis=1)))
+    engine = make_engine(addon, str(tmp_path))
+    assert not engine.transfer_shape_keys(src.data, dest.data)
+    assert "cached" not in engine.message
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import benchmark
+
+
+def make_engine(addon, directory):
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    engine.transfer_mode = 'NEAREST'
+    engine.use_cache = True
+    engine.cache_directory = os.path.join(directory, "cache")
+    engine.use_checkpoints = True
+    engine.checkpoint_directory = os.path.join(directory, "checkpoints")
+    return engine
+
+def checkpoint_files(directory):
+    directory = os.path.join(directory, "checkpoints")
+    return os.listdir(directory) if os.path.isdir(directory) else []
+
+
+# a worker whose range is the whole mesh keeps its chunks for the transfer merging them
+def test_single_range_worker_keeps_checkpoints(addon, tmp_path):
+    bpy = sys.modules["bpy"]
+    src_co, src_triangles = benchmark.uv_sphere(400)
+    dest_co, dest_triangles = benchmark.uv_sphere(576, radius=1.002)
+    src = benchmark.add_mesh(bpy, "source", src_co, src_triangles, benchmark.KEYS)
+    dest = benchmark.add_mesh(bpy, "destination", dest_co, dest_triangles)
+    ranges = addon.workers.split_vertex_range(0, len(dest_co), 4, 10000)
+    assert ranges == [(0, len(dest_co))]
+
+    worker = make_engine(addon, str(tmp_path))
+    worker.start_vertex_index, worker.total_vertices = ranges[0]
+    worker.specify_end_vertex = True
+    assert not worker.compute_vertex_range(src.data, dest.data)
+    assert len(checkpoint_files(str(tmp_path))) == 1
+
+    # the merging transfer only loads the chunks, it never searches
+    engine = make_engine(addon, str(tmp_path))
+    def no_search(chunks, finish_chunk):
+        raise AssertionError("the checkpointed range was searched again")
+    engine.compute_chunks = no_search
+    assert not engine.transfer_shape_keys(src.data, dest.data)
+    assert "bulge" in dest.data.shape_keys.key_blocks
+    # the mapping is cached now so the chunks are removed
+    assert checkpoint_files(str(tmp_path)) == []
@@ -0,0 +1,148 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+import benchmark
+
+
+def random_points(count, seed):
+    return np.random.default_rng(seed).uniform(-1.0, 1.0, (count, 3)).astype(np.float32)
+
+# nearest point within max_distance by a linear scan, the highest index wins on equal distances
+def brute_nearest(points, queries, max_distance):
+    d2 = ((queries[:, None, :].astype(np.float64) - points[None, :, :]) ** 2).sum(axis=2)
+    best_d2 = d2.min(axis=1)
+    nearest = len(points) - 1 - np.argmin(d2[:, ::-1], axis=1)
+    nearest[best_d2 > max_distance * max_distance] = -1
+    return nearest
+
+@pytest.mark.parametrize("max_distance", [0.05, 0.3, 10.0])
+def test_point_grid_find_nearest(addon, max_distance):
+    correspondence = addon.correspondence
+    points = random_points(500, 1)
+    queries = random_points(300, 2).astype(np.float64)
+    grid = correspondence.PointGrid(points, correspondence.choose_cell_size(points, max_distance))
+    nearest, d2 = grid.find_nearest(queries, max_distance)
+    assert (nearest == brute_nearest(points, queries, max_distance)).all()
+    assert np.isinf(d2[nearest < 0]).all()
+
+# duplicated points are equally close, the later copy is chosen
+def test_point_grid_find_nearest_ties(addon):
+    correspondence = addon.correspondence
+    points = np.concatenate((random_points(50, 3), random_points(50, 3)))
+    grid = correspondence.PointGrid(points, 0.2)
+    nearest, d2 = grid.find_nearest(points[:50], 1.0)
+    assert (nearest == np.arange(50, 100)).all()
+    assert (d2 == 0.0).all()
+
+def test_point_grid_find_in_radius(addon):
+    correspondence = addon.correspondence
+    points = random_points(400, 4)
+    queries = random_points(100, 5).astype(np.float64)
+    radii = np.random.default_rng(6).uniform(0.0, 0.5, len(queries))
+    grid = correspondence.PointGrid(points, 0.1)
+    rows, indices = grid.find_in_radius(queries, radii)
+    d2 = ((queries[:, None, :] - points[None, :, :].astype(np.float64)) ** 2).sum(axis=2)
+    expected_rows, expected_indices = np.nonzero(d2 <= radii[:, None] ** 2)
+    assert (rows == expected_rows).all()
+    assert (indices == expected_indices).all()
+
+
+# the fixed width gather gives the same sums as the general segment sum
+def test_blend_rows_fixed_width(addon):
+    correspondence = addon.correspondence
+    rng = np.random.default_rng(7)
+    values = rng.normal(size=(50, 3)).astype(np.float32)
+    indices = rng.integers(0, 50, (30, 4))
+    weights = rng.uniform(size=(30, 4)).astype(np.float32)
+    fixed = correspondence.Correspondence.from_fixed_width(indices, weights, np.ones(30, dtype=bool))
+    assert fixed.width == 4
+    rows = np.array([0, 3, 4, 17, 29])
+    expected = (values[indices[rows]] * weights[rows, :, None]).sum(axis=1)
+    assert np.allclose(fixed.blend_rows(values, rows), expected, atol=1e-6)
+    # an unpaired row makes the widths differ
+    partial = correspondence.Correspondence.from_fixed_width(indices, weights, np.arange(30) != 3)
+    assert partial.width is None
+    assert np.allclose(partial.blend_rows(values, rows), np.where((rows == 3)[:, None], 0.0, expected), atol=1e-6)
+    # both paths write into a given buffer
+    for mapping in (fixed, partial):
+        out = np.full((len(rows), 3), np.nan, dtype=np.float32)
+        assert mapping.blend_rows(values, rows, out) is out
+        assert np.allclose(out, mapping.blend_rows(values, rows))
+
+
+# the numpy sphere solver gives the mapping of the growing sphere search of the transfer
+@pytest.mark.parametrize("use_one_vertex", [False, True])
+def test_solve_sphere_rows_matches_serial_search(addon, use_one_vertex):
+    bpy = sys.modules["bpy"]
+    correspondence = addon.correspondence
+    src_co, src_triangles = benchmark.uv_sphere(300)
+    dest_co, dest_triangles = benchmark.uv_sphere(390, radius=1.002, rotation=0.01)
+    src = benchmark.add_mesh(bpy, "source", src_co, src_triangles, benchmark.KEYS)
+    dest = benchmark.add_mesh(bpy, "destination", dest_co, dest_triangles)
+
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    engine.transfer_mode = 'SPHERE'
+    engine.use_one_vertex = use_one_vertex
+    engine.increment_radius = 0.02
+    engine.number_of_increments = 5
+    engine.skip_vertices_with_no_pair = True
+    engine.use_cache = False
+    engine.use_checkpoints = False
+    assert not engine.compute_vertex_range(src.data, dest.data)
+    serial = engine.correspondence
+
+    radii = engine.get_search_radii()
+    grid = correspondence.PointGrid(src_co, correspondence.choose_cell_size(src_co, radii[-1]))
+    # small batches so the merge of the batches is checked too
+    solved = correspondence.solve_sphere_rows(grid, dest_co, radii, use_one_vertex, batch_size=100)
+    assert (solved.offsets == serial.offsets).all()
+    assert (solved.indices == serial.indices).all()
+    assert np.allclose(solved.weights, serial.weights)
+    # some vertices are out of reach of the largest sphere
+    assert 0 < serial.matched.sum() < serial.count
+
+
+# the parallel solver only gets the destination vertices inside the masks and gives the mapping of the serial search
+def test_parallel_solver_skips_masked_vertices(addon, monkeypatch):
+    bpy = sys.modules["bpy"]
+    shapekeytransfer = addon.shapekeytransfer
+    src_co, src_triangles = benchmark.uv_sphere(300)
+    dest_co, dest_triangles = benchmark.uv_sphere(390, radius=1.002, rotation=0.01)
+    src = benchmark.add_mesh(bpy, "source", src_co, src_triangles, benchmark.KEYS)
+    dest = benchmark.add_mesh(bpy, "destination", dest_co, dest_triangles)
+    # a box around the top cap of the sphere
+    corners = [(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (0.7, 1.1)]
+    bounds = types.SimpleNamespace(matrix_world=sys.modules["mathutils"].Matrix(), bound_box=corners)
+
+    solved_rows = []
+    class RecordingSolver(shapekeytransfer.ParallelSolver):
+        def __init__(self, src_points, dest_points, *args):
+            solved_rows.append(len(dest_points))
+            super().__init__(src_points, dest_points, *args)
+    monkeypatch.setattr(shapekeytransfer, "ParallelSolver", RecordingSolver)
+
+    mappings = []
+    for processes in (1, 2):
+        engine = addon.shapekeytransfer.ShapeKeyTransfer()
+        engine.transfer_mode = 'SPHERE'
+        engine.increment_radius = 0.02
+        engine.number_of_increments = 5
+        engine.skip_vertices_with_no_pair = True
+        engine.use_cache = False
+        engine.use_checkpoints = False
+        engine.bounds_object = bounds
+        engine.solver_processes = processes
+        engine.chunk_size = 100
+        assert not engine.compute_vertex_range(src.data, dest.data)
+        mappings.append(engine.correspondence)
+    inside = engine.dest_mask
+    assert 0 < inside.sum() < 100
+    assert solved_rows == [inside.sum()]
+    serial, parallel = mappings
+    assert (parallel.offsets == serial.offsets).all()
+    assert (parallel.indices == serial.indices).all()
+    assert np.allclose(parallel.weights, serial.weights)
+    assert not parallel.matched[~inside].any()
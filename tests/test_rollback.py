@@ -0,0 +1,68 @@
+import sys
+
+import numpy as np
+
+import benchmark
+
+
+def make_meshes():
+    bpy = sys.modules["bpy"]
+    src_co, src_triangles = benchmark.uv_sphere(400)
+    dest_co, dest_triangles = benchmark.uv_sphere(576, radius=1.002)
+    src = benchmark.add_mesh(bpy, "source", src_co, src_triangles, benchmark.KEYS)
+    # the destination already has the keys, so the transfer overwrites them
+    dest = benchmark.add_mesh(bpy, "destination", dest_co, dest_triangles, {"bulge": benchmark.key_twist, "twist": benchmark.key_twist})
+    return src, dest
+
+def make_engine(addon):
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    engine.transfer_mode = 'NEAREST'
+    engine.use_cache = False
+    engine.use_checkpoints = False
+    return engine
+
+def key_co(obj, name):
+    return obj.data.shape_keys.key_blocks[name].data.values.copy()
+
+
+# transfers run to the end without a modal operator never roll back, so they keep no original keys
+def test_synchronous_transfer_keeps_no_snapshots(addon, monkeypatch):
+    src, dest = make_meshes()
+    engine = make_engine(addon)
+    def put(store, name, array):
+        raise AssertionError("the original of " + name + " was stored")
+    monkeypatch.setattr(addon.memory.SpillStore, "put", put)
+    assert not engine.transfer_shape_keys(src.data, dest.data)
+
+# an interrupted transfer driven like the modal operator restores the keys it overwrote and removes the keys it added
+def test_interrupted_transfer_rolls_back(addon):
+    src, dest = make_meshes()
+    original = {name: key_co(dest, name) for name in ("Basis", "bulge", "twist")}
+    engine = make_engine(addon)
+    engine.keep_rollback = True
+    steps = engine.iter_transfer_shape_keys(src.data, dest.data)
+    while(engine.stage != 'APPLY' or engine.current_key_index < 2):
+        next(steps)
+    steps.close()
+    assert not np.allclose(key_co(dest, "bulge"), original["bulge"])
+    engine.rollback()
+    assert [block.name for block in dest.data.shape_keys.key_blocks] == ["Basis", "bulge", "twist"]
+    for name, co in original.items():
+        assert (key_co(dest, name) == co).all()
+
+
+# the temporaries of applying the keys count towards the peak and the buffers are given back after the transfer
+def test_transfer_accounts_apply_temporaries(addon, monkeypatch):
+    src, dest = make_meshes()
+    engine = make_engine(addon)
+    engine.fill_unpaired_vertices = True
+    touched = []
+    touch = addon.memory.MemoryBudget.touch
+    def record(budget, nbytes):
+        touched.append((engine.stage, nbytes))
+        touch(budget, nbytes)
+    monkeypatch.setattr(addon.memory.MemoryBudget, "touch", record)
+    assert not engine.transfer_shape_keys(src.data, dest.data)
+    assert any(stage == 'APPLY' and nbytes > 0 for stage, nbytes in touched)
+    assert engine.memory.peak >= max(nbytes for stage, nbytes in touched)
+    assert engine.buffers.buffers == {}
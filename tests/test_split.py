@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# split.py only needs NumPy, the package itself imports bpy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "BlendShapeSplit"))
+
+import split
+
+
+def test_falloff_step():
+    weights = split.falloff_weights(np.array([-1.0, -0.0, 0.0, 0.25]))
+    assert weights.tolist() == [0.0, 0.5, 0.5, 1.0]
+
+# a falloff without width is a hard split
+def test_falloff_zero_width_is_step():
+    distance = np.array([-0.1, 0.0, 0.1])
+    assert (split.falloff_weights(distance, 'LINEAR', 0.0) == split.falloff_weights(distance)).all()
+
+@pytest.mark.parametrize("falloff", ['LINEAR', 'SMOOTHSTEP', 'CURVE'])
+def test_falloff_blends_over_width(falloff):
+    distance = np.linspace(-1.0, 1.0, 41)
+    weights = split.falloff_weights(distance, falloff, 1.0, (0.0, 0.2, 1.0))
+    assert (weights[distance <= -0.5] == 0.0).all()
+    assert (weights[distance >= 0.5] == 1.0).all()
+    assert (np.diff(weights) >= 0.0).all()
+
+# mirrored distances get the weight of the other side, so both halves add up to the key
+@pytest.mark.parametrize("falloff", ['LINEAR', 'SMOOTHSTEP'])
+def test_falloff_is_symmetric(falloff):
+    distance = np.linspace(-1.0, 1.0, 41)
+    weights = split.falloff_weights(distance, falloff, 0.8)
+    assert np.allclose(weights + weights[::-1], 1.0)
+
+def test_falloff_linear_and_curve_values():
+    distance = np.array([-0.5, -0.25, 0.0, 0.25, 0.5])
+    assert np.allclose(split.falloff_weights(distance, 'LINEAR', 1.0), [0.0, 0.25, 0.5, 0.75, 1.0])
+    assert np.allclose(split.falloff_weights(distance, 'SMOOTHSTEP', 1.0), [0.0, 0.15625, 0.5, 0.84375, 1.0])
+    assert np.allclose(split.falloff_weights(distance, 'CURVE', 1.0, (0.0, 0.2, 1.0)), [0.0, 0.1, 0.2, 0.6, 1.0])
+
+
+def test_normalize_regions():
+    weights = np.array([[1.0, 0.0, 0.2, 0.0],
+                        [1.0, 0.5, 0.6, 0.0],
+                        [0.0, 0.0, 0.2, 0.0]])
+    normalized = split.normalize_regions(weights)
+    assert np.allclose(normalized.sum(axis=0), 1.0)
+    assert np.allclose(normalized[:, 0], [0.5, 0.5, 0.0])
+    assert np.allclose(normalized[:, 1], [0.0, 1.0, 0.0])
+    assert np.allclose(normalized[:, 2], [0.2, 0.6, 0.2])
+    # vertices outside every region are shared evenly
+    assert np.allclose(normalized[:, 3], 1.0 / 3.0)
+
+def test_region_keys_add_up_to_key():
+    rng = np.random.default_rng(0)
+    basis = rng.normal(size=(20, 3)).astype(np.float32)
+    delta = rng.normal(size=(20, 3)).astype(np.float32)
+    weights = split.normalize_regions(rng.uniform(size=(3, 20)))
+    parts = split.region_keys(basis, delta, weights)
+    assert np.allclose((parts - basis).sum(axis=0), delta, atol=1e-5)
+
+
+def test_find_split_groups():
+    names = ["Basis", "Smile", "Smile_Left", "Smile_Right", "Blink_Left", "Brow_Left_Left", "Brow_Left_Right", "_Left", "_Right"]
+    groups = split.find_split_groups(names, ("_Left", "_Right"))
+    assert groups == {"Smile": ["Smile_Left", "Smile_Right"],
+                      "Brow_Left": ["Brow_Left_Left", "Brow_Left_Right"]}
+
+def test_find_split_groups_regions():
+    names = ["Basis", "Jaw_Upper", "Jaw_Lower", "Jaw_Chin", "Lip_Upper", "Lip_Lower"]
+    groups = split.find_split_groups(names, ("_Upper", "_Lower", "_Chin"))
+    assert groups == {"Jaw": ["Jaw_Upper", "Jaw_Lower", "Jaw_Chin"]}
@@ -0,0 +1,64 @@
+import sys
+import types
+
+import benchmark
+
+
+# a transfer of the excluded keys includes the basis, which is not reported as an empty key
+def test_excluded_transfer_leaves_basis_out_of_empty_keys(addon):
+    bpy = sys.modules["bpy"]
+    src_co, src_triangles = benchmark.uv_sphere(400)
+    dest_co, dest_triangles = benchmark.uv_sphere(576, radius=1.002)
+    src = benchmark.add_mesh(bpy, "source", src_co, src_triangles, benchmark.KEYS)
+    dest = benchmark.add_mesh(bpy, "destination", dest_co, dest_triangles)
+
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    engine.transfer_mode = 'NEAREST'
+    engine.use_cache = False
+    engine.use_checkpoints = False
+    engine.excluded_shape_keys = ["Basis", "bulge", "empty"]
+    assert not engine.transfer_shape_keys(src.data, dest.data, use_only_excluded_shape_keys=True)
+    assert engine.empty_key_names == ["empty"]
+    assert "1 empty shape keys transferred: empty" in engine.message
+
+
+# the mesh users index survives transform and selection updates and is dropped when links change
+def test_mesh_users_invalidation(addon):
+    bpy = sys.modules["bpy"]
+    shapekeytransfer = addon.shapekeytransfer
+    co, triangles = benchmark.uv_sphere(100)
+    first = benchmark.add_mesh(bpy, "b_first", co, triangles)
+    second = benchmark.add_mesh(bpy, "a_second", co, triangles)
+    second.data = first.data
+    users = shapekeytransfer.MESH_USERS
+    assert users.get(first.data) == [second, first]
+
+    def update(*objects):
+        depsgraph = types.SimpleNamespace(updates=[types.SimpleNamespace(id=ob) for ob in objects])
+        shapekeytransfer.invalidate_mesh_users(None, depsgraph)
+
+    # moving an object or editing its mesh keeps the index
+    update(first, first.data)
+    assert users.users is not None
+    # a new mesh for an object drops it
+    second.data = benchmark.add_mesh(bpy, "other", co, triangles).data
+    update(second)
+    assert users.users is None
+    assert users.get(first.data) == [first]
+    # so does a new object
+    bpy.data.objects.append(benchmark.blender_standin.Object("c_third", first.data))
+    update()
+    assert users.users is None
+    assert [ob.name for ob in users.get(first.data)] == ["b_first", "c_third"]
+
+# the object giving the transform of a shared mesh is the first user by name, whatever is active
+def test_get_parent_ignores_selection(addon):
+    bpy = sys.modules["bpy"]
+    co, triangles = benchmark.uv_sphere(100)
+    first = benchmark.add_mesh(bpy, "b_first", co, triangles)
+    second = benchmark.add_mesh(bpy, "a_second", co, triangles)
+    second.data = first.data
+    engine = addon.shapekeytransfer.ShapeKeyTransfer()
+    for active in (first, second, None):
+        bpy.context.view_layer.objects.active = active
+        assert engine.get_parent(first.data) is second